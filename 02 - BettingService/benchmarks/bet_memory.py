@@ -0,0 +1,87 @@
+"""
+Measure memory used per stored bet.
+
+Compares the previous representation (a dict of pydantic Bet models keyed
+by id) with the columnar InMemoryStorage, using tracemalloc so only
+allocations made while storing the bets are counted.
+
+Usage (from the BettingService directory):
+    python -m benchmarks.bet_memory --bets 200000
+"""
+import argparse
+import random
+import tracemalloc
+from typing import Callable, Dict, List
+
+from src.models.betting import Bet, BetType
+from src.storage.memory_storage import InMemoryStorage
+
+OPTIONS = (
+    [(BetType.MATCH_WINNER, o) for o in ("home_win", "draw", "away_win")]
+    + [(BetType.GOALS_ABOVE_3, o) for o in ("yes", "no")]
+    + [(BetType.YELLOW_CARDS, str(i)) for i in range(6)]
+    + [(BetType.RED_CARDS, str(i)) for i in range(4)]
+)
+
+
+def make_bet_args(count: int, seed: int = 42) -> List[dict]:
+    rng = random.Random(seed)
+    args = []
+    for _ in range(count):
+        bet_type, option = rng.choice(OPTIONS)
+        stake = round(rng.uniform(1, 100), 2)
+        args.append(dict(
+            match_id=f"match-{rng.randint(1, 3)}",
+            bet_type=bet_type,
+            option=option,
+            stake=stake,
+            odds=2.5,
+            potential_win=stake * 2.5
+        ))
+    return args
+
+
+def measure(store: Callable[[List[dict]], object], bet_args: List[dict]) -> int:
+    """Return the bytes still allocated after storing the bets"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = store(bet_args)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def store_models(bet_args: List[dict]) -> Dict[str, Bet]:
+    bets: Dict[str, Bet] = {}
+    for args in bet_args:
+        bet = Bet(**args)
+        bets[bet.id] = bet
+    return bets
+
+
+def store_columnar(bet_args: List[dict]) -> InMemoryStorage:
+    storage = InMemoryStorage()
+    for args in bet_args:
+        storage.place_bet(Bet(**args))
+    return storage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bets", type=int, default=200_000, help="number of bets to store")
+    args = parser.parse_args()
+
+    bet_args = make_bet_args(args.bets)
+    models = measure(store_models, bet_args)
+    # Subtract the storage's fixed sample data so only per-bet memory is counted
+    columnar = measure(store_columnar, bet_args) - measure(lambda _: InMemoryStorage(), [])
+
+    print(f"bets stored:            {args.bets}")
+    print(f"pydantic models (dict): {models / args.bets:8.1f} bytes/bet")
+    print(f"columnar storage:       {columnar / args.bets:8.1f} bytes/bet")
+    print(f"reduction:              {models / columnar:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
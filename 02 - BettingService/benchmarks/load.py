@@ -0,0 +1,237 @@
+"""
+In-process load and latency benchmark for the Betting Service API.
+
+Requests are sent straight to the ASGI app, including its middleware, so
+the numbers cover routing, validation, the service layer and storage
+without any network or server overhead. Several concurrent clients issue a
+weighted mix of operations against a synthetic dataset:
+
+- `odds`:  GET /api/matches/{id}/odds
+- `place`: POST /api/bets
+- `list`:  GET /api/matches/{id}/bets/page
+
+The benchmark reports throughput, p50/p95/p99 latency per operation and
+peak resident memory. Use --output to save the results as JSON and
+--baseline to compare a run with a saved one.
+
+Usage (from the BettingService directory):
+    python -m benchmarks.load --matches 1000 --bets 1000000 --requests 50000
+    python -m benchmarks.load --mix odds=50,place=50 --output after.json --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.bet_memory import OPTIONS
+
+DEFAULT_MIX = "odds=70,place=20,list=10"
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("odds", "place", "list"):
+            raise argparse.ArgumentTypeError(f"unknown operation: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class Operations:
+    """Builds the request for each operation from a seeded random generator"""
+
+    def __init__(self, match_ids: List[str], seed: int):
+        self.match_ids = match_ids
+        self.rng = random.Random(seed)
+
+    def odds(self) -> Tuple[str, str, bytes]:
+        return "GET", f"/api/matches/{self.rng.choice(self.match_ids)}/odds", b""
+
+    def place(self) -> Tuple[str, str, bytes]:
+        bet_type, option = self.rng.choice(OPTIONS)
+        body = json.dumps({
+            "match_id": self.rng.choice(self.match_ids),
+            "bet_type": bet_type.value,
+            "option": option,
+            "stake": round(self.rng.uniform(1, 100), 2)
+        }).encode()
+        return "POST", "/api/bets", body
+
+    def list(self) -> Tuple[str, str, bytes]:
+        return "GET", f"/api/matches/{self.rng.choice(self.match_ids)}/bets/page?limit=50", b""
+
+
+async def call(app, method: str, target: str, body: bytes) -> int:
+    """Send one request through the ASGI app and return the response status"""
+    path, _, query = target.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"benchmark"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status_code = 0
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # Only reached by handlers watching for a disconnect; park until cancelled
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def run(app, operations: Operations, mix: Dict[str, float], requests: int,
+              concurrency: int) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    names = list(mix)
+    schedule = operations.rng.choices(names, weights=[mix[n] for n in names], k=requests)
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    position = 0
+
+    async def client():
+        nonlocal position
+        while position < len(schedule):
+            name = schedule[position]
+            position += 1
+            method, target, body = getattr(operations, name)()
+            started = time.perf_counter()
+            status_code = await call(app, method, target, body)
+            latencies[name].append(time.perf_counter() - started)
+            if status_code >= 400:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    if not latencies:
+        return {"requests": 0, "errors": 0, "throughput": 0.0}
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "mean_ms": float(np.mean(latencies) * 1000),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(max(latencies) * 1000),
+    }
+
+
+def print_results(results: dict, baseline: Optional[dict]):
+    print(f"{'operation':<10} {'requests':>9} {'errors':>7} {'req/s':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in results["operations"].items():
+        if not row["requests"]:
+            continue
+        line = (f"{name:<10} {row['requests']:>9} {row['errors']:>7} {row['throughput']:>10.0f} "
+                f"{row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} {row['p99_ms']:>8.3f}")
+        before = (baseline or {}).get("operations", {}).get(name)
+        if before and before.get("requests"):
+            line += (f"   throughput {row['throughput'] / before['throughput'] - 1:+.1%}, "
+                     f"p99 {row['p99_ms'] / before['p99_ms'] - 1:+.1%}")
+        print(line)
+    print(f"peak RSS: {results['peak_rss_mb']:.1f} MB "
+          f"(after loading the dataset: {results['dataset_rss_mb']:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=20, help="number of teams")
+    parser.add_argument("--matches", type=int, default=3, help="number of matches")
+    parser.add_argument("--bets", type=int, default=0, help="number of bets loaded before the run")
+    parser.add_argument("--requests", type=int, default=20_000, help="number of measured requests")
+    parser.add_argument("--warmup", type=int, default=1_000, help="number of unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=32, help="number of concurrent clients")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help=f"weighted operation mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the dataset and requests")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results saved by an earlier --output")
+    args = parser.parse_args()
+
+    # The app seeds its storage from these when it is imported; the backend
+    # can still be chosen with STORAGE_BACKEND
+    os.environ.update(SEED_TEAMS=str(args.teams), SEED_MATCHES=str(args.matches),
+                      SEED_BETS=str(args.bets), SEED_RANDOM=str(args.seed))
+    started = time.perf_counter()
+    from main import app
+    from src.services.betting_service import betting_service
+
+    match_ids = [match.id for match in betting_service.storage.get_all_matches()]
+    print(f"started with {len(match_ids)} matches and {args.bets} bets in {time.perf_counter() - started:.1f}s")
+    dataset_rss = peak_rss_mb()
+
+    operations = Operations(match_ids, args.seed)
+    loop = asyncio.new_event_loop()
+    if args.warmup:
+        loop.run_until_complete(run(app, operations, args.mix, args.warmup, args.concurrency))
+    latencies, errors, elapsed = loop.run_until_complete(
+        run(app, operations, args.mix, args.requests, args.concurrency)
+    )
+    loop.close()
+
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": type(betting_service.storage).__name__,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+        "total": summarize([x for values in latencies.values() for x in values], sum(errors.values()), elapsed),
+        "operations": {name: summarize(latencies[name], errors[name], elapsed) for name in latencies},
+        "dataset_rss_mb": dataset_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    print(f"total: {results['total']['throughput']:.0f} req/s over {elapsed:.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
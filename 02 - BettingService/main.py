@@ -1,17 +1,39 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, Header, HTTPException, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
-from typing import List, Optional
+from fastapi.responses import PlainTextResponse, RedirectResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Literal, Optional
+import os
 import uvicorn
 
 from src.models.betting import (
     Match, BettingOdds, Bet, BetType, PlaceBetRequest,
-    BettingOddsResponse, BetResponse
+    BettingOddsResponse, BetResponse, MatchBetSummary, BetPage,
+    PlaceBetBatchRequest, BatchBetResponse, MatchResult, SettlementResponse,
+    BulkOddsResponse, OddsHistoryResponse
 )
-from src.services.betting_service import betting_service
+from src.services.betting_service import betting_service, InvalidCursorError
+from src.services.idempotency import IdempotencyKeyReusedError
+from src.storage.base import MatchSettledError
+from src.services.odds_broadcaster import RESYNC, sse_event
+from src.middleware.admission import AdmissionControlMiddleware, AdmissionPool
+from src.middleware.metrics import MetricsMiddleware
+from src.monitoring.metrics import metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await betting_service.odds_broadcaster.close()
+    if betting_service.event_publisher:
+        await betting_service.event_publisher.close()
+    # Flush any buffered writes before the process exits
+    betting_service.storage.close()
+
 
 # Create FastAPI app with metadata for automatic documentation
 app = FastAPI(
+    lifespan=lifespan,
     title="Betting Service API",
     description="""
     A comprehensive betting service API for football matches.
@@ -45,6 +67,40 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
+
+def _admission_pool(method: str, path: str) -> Optional[str]:
+    """Pick the admission budget for a request; None bypasses admission control"""
+    if not path.startswith("/api/") or path in ("/api/health", "/api/metrics") or path.endswith("/stream"):
+        return None
+    return "bets" if method == "POST" else "reads"
+
+
+# Configure admission control: bet placement and reads get separate budgets.
+# Added before CORS so that rejections still carry CORS headers.
+_queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "2000")) / 1000
+app.add_middleware(
+    AdmissionControlMiddleware,
+    pools={
+        "bets": AdmissionPool(
+            "bets",
+            limit=int(os.getenv("BET_CONCURRENCY", "64")),
+            max_queue=int(os.getenv("BET_QUEUE_SIZE", "256")),
+            queue_timeout=_queue_timeout
+        ),
+        "reads": AdmissionPool(
+            "reads",
+            limit=int(os.getenv("READ_CONCURRENCY", "256")),
+            max_queue=int(os.getenv("READ_QUEUE_SIZE", "1024")),
+            queue_timeout=_queue_timeout
+        ),
+    },
+    classify=_admission_pool,
+    retry_after=int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+)
+
+# Record request metrics, including requests shed by admission control
+app.add_middleware(MetricsMiddleware, registry=metrics, prefix="betting")
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -55,6 +111,12 @@ app.add_middleware(
 )
 
 
+def _ndjson(bets: Iterator[Bet]) -> Iterator[str]:
+    """Serialize bets one line at a time so large listings are never held in memory"""
+    for bet in bets:
+        yield bet.model_dump_json() + "\n"
+
+
 @app.get("/", include_in_schema=False)
 async def redirect_to_docs():
     """Redirect root URL to Swagger documentation"""
@@ -67,59 +129,217 @@ async def health_check():
     return {"status": "healthy", "service": "betting-service"}
 
 
+@app.get("/api/metrics", response_class=PlainTextResponse, tags=["Health Check"])
+async def get_metrics():
+    """
+    Runtime metrics in Prometheus text format.
+    
+    Includes request counts, in-flight requests and latency histograms per
+    route and status code, plus bets placed, bets rejected and requests shed.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # Match Endpoints
 @app.get("/api/matches", response_model=List[Match], tags=["Matches"])
-async def get_matches():
+async def get_matches(
+    status: Optional[Literal["scheduled", "live", "finished"]] = None,
+    team_id: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Get matches for betting, ordered by match date.
+    
+    - **status**: Only matches with this status (scheduled, live or finished)
+    - **team_id**: Only matches where this team plays home or away
+    - **date_from**: Only matches on or after this date and time
+    - **date_to**: Only matches before this date and time
+    - **limit**: Maximum number of matches to return (1-1000); all when omitted
+    - **offset**: Number of matching matches to skip
+    """
+    return betting_service.find_matches(
+        status=status,
+        team_id=team_id,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        offset=offset
+    )
+
+
+# Most matches a single bulk odds request may ask for
+MAX_QUOTE_MATCHES = 100
+
+
+@app.get("/api/odds", response_model=BulkOddsResponse, tags=["Odds"])
+async def get_bulk_odds(
+    match_ids: Optional[List[str]] = Query(None, description="Comma-separated match ids, or the parameter repeated"),
+    bet_types: Optional[List[str]] = Query(None, description="Comma-separated bet types; all when omitted")
+):
     """
-    Get all available matches for betting.
+    Get betting odds for many matches in one response.
     
-    Returns a list of all scheduled and live matches.
+    Returns one quote per requested match, in request order. A match that
+    does not exist gets a quote with an `error` instead of failing the request.
+    
+    - **match_ids**: Up to 100 match ids
+    - **bet_types**: Only include these bet types (match_winner, goals_above_3, yellow_cards, red_cards)
     """
-    return betting_service.get_all_matches()
+    ids = list(dict.fromkeys(i for value in match_ids or [] for i in value.split(",") if i))
+    if not ids or len(ids) > MAX_QUOTE_MATCHES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Between 1 and {MAX_QUOTE_MATCHES} match ids are required"
+        )
+
+    types = None
+    if bet_types:
+        try:
+            types = list(dict.fromkeys(BetType(t) for value in bet_types for t in value.split(",") if t))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    content = betting_service.get_encoded_odds_quotes(ids, types)
+    return Response(content=content, media_type="application/json")
 
 
 @app.get("/api/matches/{match_id}/odds", response_model=BettingOddsResponse, tags=["Odds"])
-async def get_match_odds(match_id: str):
+async def get_match_odds(match_id: str, if_none_match: Optional[str] = Header(None)):
     """
     Get all betting odds for a specific match.
     
+    Responses carry an `ETag`; send it back in `If-None-Match` to get a
+    `304 Not Modified` while the odds are unchanged.
+    
     - **match_id**: The unique identifier of the match
     """
-    odds_response = betting_service.get_match_odds(match_id)
-    if not odds_response:
+    return _odds_response(match_id, None, if_none_match)
+
+
+@app.get("/api/matches/{match_id}/odds/stream", tags=["Odds"])
+async def stream_match_odds(match_id: str):
+    """
+    Stream odds changes for a match as server-sent events.
+    
+    The first `snapshot` event carries the full odds response. Every later
+    `delta` event carries the match status and only the odds that changed,
+    with bursts of changes coalesced into a single event.
+    
+    - **match_id**: The unique identifier of the match
+    """
+    if not betting_service.get_match(match_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Match with ID {match_id} not found"
         )
-    return odds_response
+    
+    subscription = betting_service.odds_broadcaster.subscribe(match_id)
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            yield sse_event("snapshot", betting_service.get_encoded_odds(match_id))
+            while True:
+                message = await subscription.queue.get()
+                if message == RESYNC:
+                    message = sse_event("snapshot", betting_service.get_encoded_odds(match_id))
+                yield message
+        finally:
+            betting_service.odds_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/matches/{match_id}/odds/history", response_model=OddsHistoryResponse, tags=["Odds"])
+async def get_odds_history(
+    match_id: str,
+    bet_type: Optional[BetType] = None,
+    option: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    points: int = Query(100, ge=2, le=1000)
+):
+    """
+    Get how a match's odds have moved over a time window.
+    
+    Each option's history is downsampled to at most `points` points: the
+    price in effect at `since`, then the last price in each equal time slice.
+    
+    - **match_id**: The unique identifier of the match
+    - **bet_type**: Only this bet type
+    - **option**: Only this option (e.g. home_win)
+    - **since**: Start of the window; defaults to when the match's odds were set
+    - **until**: End of the window; defaults to now
+    - **points**: Maximum number of points per option (2-1000)
+    """
+    try:
+        history = betting_service.get_odds_history(match_id, bet_type, option, since, until, points)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not history:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Match with ID {match_id} not found"
+        )
+    return history
 
 
 @app.get("/api/matches/{match_id}/odds/{bet_type}", response_model=List[BettingOdds], tags=["Odds"])
-async def get_odds_by_type(match_id: str, bet_type: BetType):
+async def get_odds_by_type(match_id: str, bet_type: BetType, if_none_match: Optional[str] = Header(None)):
     """
     Get betting odds for a specific bet type on a match.
     
+    Supports conditional requests via `ETag`/`If-None-Match`.
+    
     - **match_id**: The unique identifier of the match
     - **bet_type**: The type of bet (match_winner, goals_above_3, yellow_cards, red_cards)
     """
-    # First check if match exists
-    match_odds = betting_service.get_match_odds(match_id)
-    if not match_odds:
+    return _odds_response(match_id, bet_type, if_none_match)
+
+
+def _odds_response(match_id: str, bet_type: Optional[BetType], if_none_match: Optional[str]) -> Response:
+    """Build a cached odds response, or a 304 if the client's copy is current"""
+    if not betting_service.get_match(match_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Match with ID {match_id} not found"
         )
-    
-    odds = betting_service.get_odds_by_type(match_id, bet_type)
-    return odds
+
+    etag = betting_service.get_odds_etag(match_id)
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    content = betting_service.get_encoded_odds(match_id, bet_type)
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
 
 
 # Betting Endpoints
 @app.post("/api/bets", response_model=BetResponse, tags=["Bets"])
-async def place_bet(bet_request: PlaceBetRequest):
+async def place_bet(
+    bet_request: PlaceBetRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255)
+):
     """
     Place a new bet on a match.
     
+    Send a unique `Idempotency-Key` header to make retries safe: a repeated
+    request with the same key gets the original response (marked with
+    `Idempotent-Replayed: true`) instead of placing another bet.
+    
     - **match_id**: The unique identifier of the match
     - **bet_type**: The type of bet (match_winner, goals_above_3, yellow_cards, red_cards)
     - **option**: The specific option to bet on (e.g., "home_win", "yes", "2")
@@ -127,17 +347,50 @@ async def place_bet(bet_request: PlaceBetRequest):
     
     Returns the placed bet with calculated potential winnings.
     """
-    bet_response = betting_service.place_bet(bet_request)
+    async def place() -> BetResponse:
+        bet_response = betting_service.place_bet(bet_request)
+        if bet_response.success:
+            # Only acknowledge the bet once it is durable (no-op without a bet log)
+            await betting_service.storage.wait_durable()
+        return bet_response
+
+    if idempotency_key:
+        fingerprint = (bet_request.match_id, bet_request.bet_type, bet_request.option, bet_request.stake)
+        try:
+            bet_response, replayed = await betting_service.idempotency_cache.run(
+                idempotency_key, fingerprint, place
+            )
+        except IdempotencyKeyReusedError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+    else:
+        bet_response = await place()
     
     if not bet_response.success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=bet_response.message
+            detail=bet_response.message,
+            headers=dict(response.headers)
         )
-    
     return bet_response
 
 
+@app.post("/api/bets/batch", response_model=BatchBetResponse, tags=["Bets"])
+async def place_bets(batch_request: PlaceBetBatchRequest):
+    """
+    Place up to 1000 bets in a single request.
+    
+    Each bet is validated independently; invalid bets do not prevent the
+    valid ones from being placed. The response contains one result per
+    requested bet, in the same order as the request.
+    """
+    results = betting_service.place_bets(batch_request.bets)
+    await betting_service.storage.wait_durable()
+    placed = sum(1 for result in results if result.success)
+    return BatchBetResponse(placed=placed, failed=len(results) - placed, results=results)
+
+
 @app.get("/api/bets", response_model=List[Bet], tags=["Bets"])
 async def get_all_bets():
     """
@@ -148,6 +401,37 @@ async def get_all_bets():
     return betting_service.get_all_bets()
 
 
+@app.get("/api/bets/page", response_model=BetPage, tags=["Bets"])
+async def get_bets_page(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    """
+    Get placed bets one page at a time, ordered by placement time.
+    
+    - **limit**: Maximum number of bets to return (1-1000)
+    - **cursor**: The `next_cursor` value from the previous page
+    """
+    try:
+        return betting_service.get_bets_page(limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@app.get("/api/bets/stream", tags=["Bets"])
+async def stream_bets(cursor: Optional[str] = None):
+    """
+    Stream all placed bets as newline-delimited JSON, ordered by placement time.
+    
+    - **cursor**: Optional `next_cursor` value to resume after
+    """
+    try:
+        bets = betting_service.iter_bets(cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return StreamingResponse(_ndjson(bets), media_type="application/x-ndjson")
+
+
 @app.get("/api/bets/{bet_id}", response_model=Bet, tags=["Bets"])
 async def get_bet(bet_id: str):
     """
@@ -182,5 +466,106 @@ async def get_bets_for_match(match_id: str):
     return betting_service.get_bets_for_match(match_id)
 
 
+@app.post("/api/matches/{match_id}/settle", response_model=SettlementResponse, tags=["Bets"])
+async def settle_match(match_id: str, result: MatchResult):
+    """
+    Settle all bets on a match from its final result.
+    
+    Every active bet on the match is marked won or lost, the match is marked
+    finished, and the totals for payout and house profit/loss are returned.
+    
+    - **match_id**: The unique identifier of the match
+    - **winner**: home_win, away_win or draw
+    - **total_goals**: Total goals scored in the match
+    - **yellow_cards**: Total yellow cards shown
+    - **red_cards**: Total red cards shown
+    """
+    match = betting_service.get_match(match_id)
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Match with ID {match_id} not found"
+        )
+    already_settled = HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Match with ID {match_id} has already been settled"
+    )
+    if match.status == "finished":
+        raise already_settled
+    
+    try:
+        settlement = betting_service.settle_match(match_id, result)
+    except MatchSettledError:
+        # Settled by another worker sharing the database
+        raise already_settled
+    await betting_service.storage.wait_durable()
+    return settlement
+
+
+@app.get("/api/matches/{match_id}/bets/page", response_model=BetPage, tags=["Bets"])
+async def get_bets_page_for_match(
+    match_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    """
+    Get bets placed on a specific match one page at a time, ordered by placement time.
+    
+    - **match_id**: The unique identifier of the match
+    - **limit**: Maximum number of bets to return (1-1000)
+    - **cursor**: The `next_cursor` value from the previous page
+    """
+    if not betting_service.get_match(match_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Match with ID {match_id} not found"
+        )
+    
+    try:
+        return betting_service.get_bets_page(limit, cursor=cursor, match_id=match_id)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@app.get("/api/matches/{match_id}/bets/stream", tags=["Bets"])
+async def stream_bets_for_match(match_id: str, cursor: Optional[str] = None):
+    """
+    Stream bets placed on a specific match as newline-delimited JSON.
+    
+    - **match_id**: The unique identifier of the match
+    - **cursor**: Optional `next_cursor` value to resume after
+    """
+    if not betting_service.get_match(match_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Match with ID {match_id} not found"
+        )
+    
+    try:
+        bets = betting_service.iter_bets(cursor=cursor, match_id=match_id)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return StreamingResponse(_ndjson(bets), media_type="application/x-ndjson")
+
+
+@app.get("/api/matches/{match_id}/bets/summary", response_model=MatchBetSummary, tags=["Bets"])
+async def get_bet_summary(match_id: str):
+    """
+    Get aggregated bet totals for a specific match.
+    
+    Returns the bet count, total stake and total potential winnings for the
+    match as a whole and for every bet type/option that has received bets.
+    
+    - **match_id**: The unique identifier of the match
+    """
+    summary = betting_service.get_bet_summary(match_id)
+    if not summary:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Match with ID {match_id} not found"
+        )
+    return summary
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
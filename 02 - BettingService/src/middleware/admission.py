@@ -0,0 +1,120 @@
+from typing import Callable, Deque, Dict, Optional
+from collections import deque
+import asyncio
+import json
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.monitoring.metrics import requests_shed
+
+
+class AdmissionPool:
+    """
+    A concurrency budget with a bounded wait queue.
+
+    Up to `limit` requests run at once and up to `max_queue` more wait for a
+    slot. A request that arrives when the queue is full, or that waits
+    longer than `queue_timeout` seconds, is rejected instead of queued.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[int]:
+        """Take a slot; returns None on success or the HTTP status to reject with"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return 429
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+            return None
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # The slot was handed over just as the wait timed out
+                return None
+            waiter.cancel()
+            return 503
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self):
+        # Hand the slot straight to the oldest live waiter, if any
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds load before it queues without bound.
+
+    Each request is mapped to an AdmissionPool by `classify`; requests that
+    map to no pool (health checks, docs, long-lived streams) bypass admission.
+    Giving bet placement and reads separate pools means a spike in bets
+    cannot starve the read endpoints.
+    """
+
+    def __init__(self, app: ASGIApp, pools: Dict[str, AdmissionPool],
+                 classify: Callable[[str, str], Optional[str]], retry_after: int = 1):
+        self.app = app
+        self.pools = pools
+        self.classify = classify
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        pool_name = self.classify(scope["method"], scope["path"])
+        pool = self.pools.get(pool_name) if pool_name else None
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await pool.acquire()
+        if rejection:
+            await self._reject(send, rejection, pool)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release()
+
+    async def _reject(self, send: Send, status_code: int, pool: AdmissionPool):
+        requests_shed.inc(pool.name, str(status_code))
+        reason = "queue is full" if status_code == 429 else "timed out waiting in queue"
+        body = json.dumps({"detail": f"Server busy: {pool.name} {reason}, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
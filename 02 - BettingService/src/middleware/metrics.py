@@ -0,0 +1,74 @@
+from typing import Dict, Tuple
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.monitoring.metrics import MetricsRegistry
+
+# Bound on remembered (method, path) -> route template lookups
+ROUTE_CACHE_SIZE = 10_000
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records request count, in-flight requests and latency per route.
+
+    Requests are labelled with their route template (e.g.
+    `/api/bets/{bet_id}`) rather than the raw path, so label cardinality is
+    bounded by the number of routes.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry, prefix: str):
+        self.app = app
+        self.requests = registry.counter(
+            f"{prefix}_http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+        )
+        self.in_flight = registry.gauge(
+            f"{prefix}_http_requests_in_flight", "HTTP requests currently being handled", ["method", "route"]
+        )
+        self.latency = registry.histogram(
+            f"{prefix}_http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+        )
+        self._routes: Dict[Tuple[str, str], str] = {}
+
+    def _route(self, scope: Scope) -> str:
+        key = (scope["method"], scope["path"])
+        route = self._routes.get(key)
+        if route is None:
+            route = UNMATCHED_ROUTE
+            for candidate in scope["app"].router.routes:
+                match, _ = candidate.matches(scope)
+                if match == Match.FULL:
+                    route = candidate.path
+                    break
+            if len(self._routes) >= ROUTE_CACHE_SIZE:
+                self._routes.clear()
+            self._routes[key] = route
+        return route
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route(scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.in_flight.inc(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            status = str(status_code)
+            self.latency.observe(time.perf_counter() - start, method, route, status)
+            self.requests.inc(method, route, status)
+            self.in_flight.dec(method, route)
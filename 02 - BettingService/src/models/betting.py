@@ -58,7 +58,88 @@ class BettingOddsResponse(BaseModel):
     odds: List[BettingOdds]
 
 
+class MatchOddsQuote(BaseModel):
+    match_id: str
+    match: Optional[Match] = None
+    odds: List[BettingOdds] = []
+    error: Optional[str] = None
+
+
+class BulkOddsResponse(BaseModel):
+    quotes: List[MatchOddsQuote]
+
+
+class OddsHistoryPoint(BaseModel):
+    timestamp: datetime
+    odds: float
+
+
+class OddsHistorySeries(BaseModel):
+    bet_type: BetType
+    option: str
+    points: List[OddsHistoryPoint]
+
+
+class OddsHistoryResponse(BaseModel):
+    match_id: str
+    since: datetime
+    until: datetime
+    series: List[OddsHistorySeries]
+
+
 class BetResponse(BaseModel):
     success: bool
     bet: Optional[Bet] = None
-    message: str
\ No newline at end of file
+    message: str
+
+
+class BetTotals(BaseModel):
+    count: int = 0
+    total_stake: float = 0.0
+    total_potential_win: float = 0.0
+
+
+class OptionBetTotals(BetTotals):
+    bet_type: BetType
+    option: str
+
+
+class MatchBetSummary(BaseModel):
+    match_id: str
+    totals: BetTotals
+    options: List[OptionBetTotals]
+
+
+class BetPage(BaseModel):
+    bets: List[Bet]
+    next_cursor: Optional[str] = None
+
+
+class PlaceBetBatchRequest(BaseModel):
+    bets: List[PlaceBetRequest] = Field(min_length=1, max_length=1000)
+
+
+class BatchBetResponse(BaseModel):
+    placed: int
+    failed: int
+    results: List[BetResponse]
+
+
+class MatchResult(BaseModel):
+    winner: Literal["home_win", "away_win", "draw"]
+    total_goals: int = Field(ge=0)
+    yellow_cards: int = Field(ge=0)
+    red_cards: int = Field(ge=0)
+
+
+class SettlementTotals(BaseModel):
+    bets_settled: int = 0
+    bets_won: int = 0
+    total_stake: float = 0.0
+    total_payout: float = 0.0
+
+
+class SettlementResponse(SettlementTotals):
+    match_id: str
+    bets_lost: int
+    house_profit: float = Field(description="Total stake minus total payout; negative is a loss")
\ No newline at end of file
@@ -1,19 +1,108 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Iterator, Tuple
+from datetime import datetime, timedelta, timezone
+import base64
+import json
+import os
+import uuid
+from pydantic import TypeAdapter
 from src.models.betting import (
     Match, BettingOdds, Bet, BetType, PlaceBetRequest, 
-    BettingOddsResponse, BetResponse
+    BettingOddsResponse, BetResponse, MatchBetSummary, BetPage,
+    MatchResult, SettlementResponse, MatchOddsQuote, OddsHistoryResponse
 )
-from src.storage.memory_storage import storage
+from src.monitoring.metrics import bets_placed, bets_rejected
+from src.services.event_publisher import EventPublisher, bet_placed_event
+from src.services.idempotency import IdempotencyCache
+from src.services.odds_broadcaster import OddsBroadcaster
+from src.services.odds_engine import OddsEngine
+from src.storage.base import BettingStorage, BetKey, MatchSettledError
+from src.storage.factory import storage
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(key: BetKey) -> str:
+    placed_at, bet_id = key
+    raw = f"{placed_at.isoformat()}|{bet_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> BetKey:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        placed_at, bet_id = raw.split("|", 1)
+        uuid.UUID(bet_id)
+        return datetime.fromisoformat(placed_at), bet_id
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+_odds_list_adapter = TypeAdapter(List[BettingOdds])
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Match dates are stored as naive UTC, which cannot be compared with aware datetimes
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 class BettingService:
-    def __init__(self):
+    def __init__(self, storage: BettingStorage = storage):
         self.storage = storage
+        # (match_id, bet_type or None for all odds) -> (match version, encoded JSON)
+        self._odds_cache: Dict[Tuple[str, Optional[BetType]], Tuple[int, bytes]] = {}
+        # Reprices markets as liability builds up; disable with ODDS_REPRICING=false
+        self.odds_engine: Optional[OddsEngine] = None
+        if os.getenv("ODDS_REPRICING", "true").lower() == "true":
+            self.odds_engine = OddsEngine(
+                self.storage, liquidity=float(os.getenv("ODDS_LIQUIDITY", "10000"))
+            )
+        # Pushes coalesced odds changes to streaming clients
+        self.odds_broadcaster = OddsBroadcaster(
+            self.storage, window=float(os.getenv("ODDS_STREAM_WINDOW_MS", "250")) / 1000
+        )
+        self.storage.add_odds_listener(self.odds_broadcaster.mark_changed)
+        # Results of recent POST /api/bets requests by Idempotency-Key
+        self.idempotency_cache: IdempotencyCache[BetResponse] = IdempotencyCache(
+            max_entries=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "100000")),
+            ttl=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+        )
+        # Sends bet_placed events to the MatchEventLogger when EVENT_LOGGER_URL is set
+        self.event_publisher: Optional[EventPublisher] = None
+        if os.getenv("EVENT_LOGGER_URL"):
+            self.event_publisher = EventPublisher(
+                os.getenv("EVENT_LOGGER_URL"),
+                queue_size=int(os.getenv("EVENT_QUEUE_SIZE", "10000")),
+                batch_size=int(os.getenv("EVENT_BATCH_SIZE", "100")),
+                flush_interval=float(os.getenv("EVENT_FLUSH_INTERVAL_MS", "200")) / 1000,
+                max_retries=int(os.getenv("EVENT_MAX_RETRIES", "5")),
+                spill_dir=os.getenv("EVENT_SPILL_DIR")
+            )
 
     def get_all_matches(self) -> List[Match]:
         """Get all available matches"""
         return self.storage.get_all_matches()
 
+    def find_matches(self, status: Optional[str] = None, team_id: Optional[str] = None,
+                     date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                     limit: Optional[int] = None, offset: int = 0) -> List[Match]:
+        """Get matches in date order, filtered by status, team and match date range"""
+        return self.storage.find_matches(
+            status=status,
+            team_id=team_id,
+            date_from=_to_naive_utc(date_from),
+            date_to=_to_naive_utc(date_to),
+            limit=limit,
+            offset=offset
+        )
+
+    def get_match(self, match_id: str) -> Optional[Match]:
+        """Get a specific match by ID"""
+        return self.storage.get_match(match_id)
+
     def get_match_odds(self, match_id: str) -> Optional[BettingOddsResponse]:
         """Get all odds for a specific match"""
         match = self.storage.get_match(match_id)
@@ -27,15 +116,164 @@ class BettingService:
         """Get odds for a specific bet type on a match"""
         return self.storage.get_odds_by_type(match_id, bet_type)
 
+    def get_odds_etag(self, match_id: str) -> str:
+        """Get the current ETag for a match's odds responses"""
+        return f'"{self.storage.epoch}-{self.storage.get_match_version(match_id)}"'
+
+    def get_encoded_odds(self, match_id: str, bet_type: Optional[BetType] = None) -> Optional[bytes]:
+        """
+        Get the JSON-encoded odds response for a match, optionally for one bet type.
+        
+        Encoded responses are cached per match and bet type, and rebuilt only
+        when the match's version changes.
+        """
+        match = self.storage.get_match(match_id)
+        if not match:
+            return None
+
+        version = self.storage.get_match_version(match_id)
+        cached = self._odds_cache.get((match_id, bet_type))
+        if cached and cached[0] == version:
+            return cached[1]
+
+        if bet_type is None:
+            odds = self.storage.get_odds_for_match(match_id)
+            content = BettingOddsResponse(match=match, odds=odds).model_dump_json().encode()
+        else:
+            content = _odds_list_adapter.dump_json(self.storage.get_odds_by_type(match_id, bet_type))
+
+        self._odds_cache[(match_id, bet_type)] = (version, content)
+        return content
+
+    def get_encoded_odds_quotes(self, match_ids: List[str], bet_types: Optional[List[BetType]] = None) -> bytes:
+        """
+        Get the JSON-encoded bulk odds response for several matches.
+        
+        Each quote is spliced together from the cached per-match encodings, so
+        odds that have not changed are not serialized again. An unknown match
+        id gets a quote with an error instead of failing the whole response.
+        """
+        quotes = []
+        for match_id in match_ids:
+            match = self.storage.get_match(match_id)
+            if not match:
+                quotes.append(MatchOddsQuote(
+                    match_id=match_id, error=f"Match with ID {match_id} not found"
+                ).model_dump_json().encode())
+                continue
+
+            prefix = b'{"match_id":' + json.dumps(match_id).encode() + b","
+            if bet_types is None:
+                # The cached response is {"match":...,"odds":[...]}
+                body = self.get_encoded_odds(match_id)[1:-1]
+            else:
+                odds = [self.get_encoded_odds(match_id, bet_type)[1:-1] for bet_type in bet_types]
+                body = (b'"match":' + match.model_dump_json().encode()
+                        + b',"odds":[' + b",".join(o for o in odds if o) + b"]")
+            quotes.append(prefix + body + b',"error":null}')
+        return b'{"quotes":[' + b",".join(quotes) + b"]}"
+
+    def get_odds_history(self, match_id: str, bet_type: Optional[BetType] = None, option: Optional[str] = None,
+                         since: Optional[datetime] = None, until: Optional[datetime] = None,
+                         max_points: int = 100) -> Optional[OddsHistoryResponse]:
+        """
+        Get downsampled price history for a match's odds.
+        
+        The window defaults to the time since the match's odds were set, up to now.
+        """
+        if not self.storage.get_match(match_id):
+            return None
+
+        until = _to_naive_utc(until) or datetime.utcnow()
+        since = _to_naive_utc(since) or self.storage.get_odds_opened_at(match_id) or until - timedelta(days=1)
+        if since >= until:
+            raise ValueError("since must be before until")
+
+        series = self.storage.get_odds_history(match_id, since, until, max_points, bet_type, option)
+        return OddsHistoryResponse(match_id=match_id, since=since, until=until, series=series)
+
     def place_bet(self, bet_request: PlaceBetRequest) -> BetResponse:
         """Place a new bet"""
-        # Validate match exists
         match = self.storage.get_match(bet_request.match_id)
+        bet, error = self._build_bet(bet_request, match)
+        if error:
+            return BetResponse(success=False, message=error)
+
+        if self.odds_engine:
+            self.odds_engine.prepare([bet])
+        # Store the bet
+        try:
+            stored_bet = self.storage.place_bet(bet)
+        except MatchSettledError:
+            # Settled by another worker; the storage has marked it finished here too
+            bets_rejected.inc("match_finished")
+            return BetResponse(success=False, message=f"Match with ID {bet.match_id} has finished")
+        bets_placed.inc()
+        if self.odds_engine:
+            self.odds_engine.record_bet(stored_bet)
+        if self.event_publisher:
+            self.event_publisher.publish(bet_placed_event(stored_bet, match))
+        
+        return BetResponse(
+            success=True,
+            bet=stored_bet,
+            message="Bet placed successfully"
+        )
+
+    def place_bets(self, bet_requests: List[PlaceBetRequest]) -> List[BetResponse]:
+        """Place several bets in one pass, returning a result for each request"""
+        matches: Dict[str, Optional[Match]] = {}
+        results: List[BetResponse] = []
+        valid_bets: List[Bet] = []
+
+        for bet_request in bet_requests:
+            # Each match is looked up once per batch
+            if bet_request.match_id not in matches:
+                matches[bet_request.match_id] = self.storage.get_match(bet_request.match_id)
+
+            bet, error = self._build_bet(bet_request, matches[bet_request.match_id])
+            if error:
+                results.append(BetResponse(success=False, message=error))
+            else:
+                valid_bets.append(bet)
+                results.append(BetResponse(success=True, bet=bet, message="Bet placed successfully"))
+
+        if self.odds_engine:
+            self.odds_engine.prepare(valid_bets)
+        settled = set()
+        while True:
+            try:
+                self.storage.place_bets(valid_bets)
+                break
+            except MatchSettledError as e:
+                # Settled by another worker; nothing was stored, so place the
+                # bets on the other matches again
+                settled |= e.match_ids
+                valid_bets = [bet for bet in valid_bets if bet.match_id not in settled]
+        if settled:
+            for i, result in enumerate(results):
+                if result.success and result.bet.match_id in settled:
+                    bets_rejected.inc("match_finished")
+                    results[i] = BetResponse(success=False, message=f"Match with ID {result.bet.match_id} has finished")
+        bets_placed.inc(amount=len(valid_bets))
+        if self.odds_engine:
+            for bet in valid_bets:
+                self.odds_engine.record_bet(bet)
+        if self.event_publisher:
+            for bet in valid_bets:
+                self.event_publisher.publish(bet_placed_event(bet, matches[bet.match_id]))
+        return results
+
+    def _build_bet(self, bet_request: PlaceBetRequest,
+                   match: Optional[Match]) -> Tuple[Optional[Bet], Optional[str]]:
+        """Validate a bet request and create the bet, or return an error message"""
+        # Validate match exists and is still open for betting
         if not match:
-            return BetResponse(
-                success=False,
-                message=f"Match with ID {bet_request.match_id} not found"
-            )
+            bets_rejected.inc("match_not_found")
+            return None, f"Match with ID {bet_request.match_id} not found"
+        if match.status == "finished":
+            bets_rejected.inc("match_finished")
+            return None, f"Match with ID {bet_request.match_id} has finished"
 
         # Validate odds exist for this bet
         odds = self.storage.get_specific_odds(
@@ -44,10 +282,8 @@ class BettingService:
             bet_request.option
         )
         if not odds:
-            return BetResponse(
-                success=False,
-                message=f"No odds available for {bet_request.bet_type.value} with option '{bet_request.option}'"
-            )
+            bets_rejected.inc("no_odds")
+            return None, f"No odds available for {bet_request.bet_type.value} with option '{bet_request.option}'"
 
         # Create the bet
         potential_win = bet_request.stake * odds.odds
@@ -59,14 +295,22 @@ class BettingService:
             odds=odds.odds,
             potential_win=potential_win
         )
+        return bet, None
 
-        # Store the bet
-        stored_bet = self.storage.place_bet(bet)
-        
-        return BetResponse(
-            success=True,
-            bet=stored_bet,
-            message="Bet placed successfully"
+    def settle_match(self, match_id: str, result: MatchResult) -> SettlementResponse:
+        """Settle every active bet on a finished match and report payout totals"""
+        winning_options = [
+            (BetType.MATCH_WINNER, result.winner),
+            (BetType.GOALS_ABOVE_3, "yes" if result.total_goals > 3 else "no"),
+            (BetType.YELLOW_CARDS, str(result.yellow_cards)),
+            (BetType.RED_CARDS, str(result.red_cards)),
+        ]
+        totals = self.storage.settle_match(match_id, winning_options)
+        return SettlementResponse(
+            match_id=match_id,
+            bets_lost=totals.bets_settled - totals.bets_won,
+            house_profit=totals.total_stake - totals.total_payout,
+            **totals.model_dump()
         )
 
     def get_bet(self, bet_id: str) -> Optional[Bet]:
@@ -81,6 +325,24 @@ class BettingService:
         """Get all bets for a specific match"""
         return self.storage.get_bets_for_match(match_id)
 
+    def get_bets_page(self, limit: int, cursor: Optional[str] = None,
+                      match_id: Optional[str] = None) -> BetPage:
+        """Get a page of bets, ordered by placement time"""
+        after = decode_cursor(cursor) if cursor else None
+        bets, next_key = self.storage.get_bets_page(limit, match_id=match_id, after=after)
+        return BetPage(bets=bets, next_cursor=encode_cursor(next_key) if next_key else None)
+
+    def iter_bets(self, cursor: Optional[str] = None, match_id: Optional[str] = None) -> Iterator[Bet]:
+        """Lazily iterate bets, ordered by placement time"""
+        after = decode_cursor(cursor) if cursor else None
+        return self.storage.iter_bets(match_id=match_id, after=after)
+
+    def get_bet_summary(self, match_id: str) -> Optional[MatchBetSummary]:
+        """Get running bet totals for a match"""
+        if not self.storage.get_match(match_id):
+            return None
+        return self.storage.get_bet_summary(match_id)
+
 
 # Global service instance
 betting_service = BettingService()
\ No newline at end of file
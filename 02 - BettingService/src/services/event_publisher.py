@@ -0,0 +1,268 @@
+from typing import IO, List, Optional
+from pathlib import Path
+import asyncio
+import json
+import os
+import shutil
+import httpx
+from src.models.betting import Bet, Match
+from src.monitoring.metrics import events_dropped, events_published, events_spilled
+
+SPILL_FILE = "events-spill.jsonl"
+
+
+def _read_lines(f: IO[str], count: int) -> List[str]:
+    """Read up to `count` lines from a text file"""
+    return [line for _, line in zip(range(count), f)]
+
+
+def bet_placed_event(bet: Bet, match: Match) -> dict:
+    """MatchEventLogger event for a newly placed bet"""
+    return {
+        "event_type": "bet_placed",
+        "match_id": bet.match_id,
+        "team_home": match.home_team.name,
+        "team_away": match.away_team.name,
+        "details": {
+            "bet_id": bet.id,
+            "bet_type": bet.bet_type.value,
+            "option": bet.option,
+            "stake": bet.stake,
+            "odds": bet.odds,
+            "potential_win": bet.potential_win,
+        },
+        "timestamp": bet.placed_at.isoformat(),
+    }
+
+
+class EventPublisher:
+    """
+    Publishes events to the MatchEventLogger without blocking the caller.
+
+    `publish` only puts the event on a bounded in-process queue; an event
+    that does not fit is dropped and counted, so placing a bet never waits
+    on the logger or the disk. A single background task drains the queue in
+    batches of up to `batch_size`, waiting at most `flush_interval` to fill
+    a batch. Each batch goes to the logger's bulk endpoint in one request
+    over a keep-alive HTTP client, and failed sends are retried with
+    exponential backoff.
+
+    Batches that still fail after `max_retries` are appended to a spill
+    file in `spill_dir`, or dropped and counted without one. While the
+    logger is down, later batches are spilled straight away, with one send
+    attempt every `max_backoff` seconds to find out whether it is back, so
+    the queue keeps draining. The spill file is replayed, a batch at a
+    time, once the logger accepts events again. All file I/O runs in worker
+    threads. A different `transport` (e.g. `httpx.ASGITransport` around a
+    stub logger app) can be passed in to run against a local stub instead
+    of the real logger.
+    """
+
+    def __init__(self, url: str, queue_size: int = 10_000, batch_size: int = 100,
+                 flush_interval: float = 0.2, max_retries: int = 5, backoff: float = 0.1,
+                 max_backoff: float = 5.0, spill_dir: Optional[str] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url.rstrip("/")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.spill_path = Path(spill_dir) / SPILL_FILE if spill_dir else None
+        if self.spill_path:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=queue_size)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        # Events taken off the queue but not yet delivered
+        self._batch: List[dict] = []
+        # Loop time of the next send attempt while the logger is down
+        self._retry_at: Optional[float] = None
+
+    def publish(self, event: dict):
+        """Queue an event for delivery; never waits on the logger"""
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # No event loop (e.g. a script using the service directly); the
+                # event is sent once the publisher runs inside one
+                pass
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            events_dropped.inc("queue_full")
+
+    async def _overflow(self, events: List[dict], reason: str):
+        if not events:
+            return
+        if not self.spill_path:
+            events_dropped.inc(reason, amount=len(events))
+            return
+        try:
+            await asyncio.to_thread(self._append_spill, events)
+        except OSError:
+            events_dropped.inc("spill_failed", amount=len(events))
+            return
+        events_spilled.inc(amount=len(events))
+
+    def _append_spill(self, events: List[dict], rest: Optional[IO[str]] = None):
+        with open(self.spill_path, "a") as f:
+            f.writelines(json.dumps(event) + "\n" for event in events)
+            if rest:
+                shutil.copyfileobj(rest, f)
+
+    async def _run(self):
+        self._client = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=self.batch_size, max_keepalive_connections=self.batch_size),
+        )
+        await self._replay_spilled()
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._next_batch()
+            if self._retry_at is None:
+                delivered = await self._send_with_retry(self._batch)
+            elif loop.time() >= self._retry_at:
+                # The logger was down; one attempt tells whether it is back
+                delivered = not await self._send(self._batch)
+            else:
+                delivered = False
+            if delivered:
+                self._retry_at = None
+            else:
+                if self._retry_at is None or loop.time() >= self._retry_at:
+                    self._retry_at = loop.time() + self.max_backoff
+                await self._overflow(self._batch, "send_failed")
+            self._batch = []
+            if delivered and self._queue.empty():
+                await self._replay_spilled()
+
+    async def _next_batch(self):
+        # Events are collected straight into self._batch so that close() can
+        # account for them if it cancels the task part-way
+        self._batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(self._batch) < self.batch_size:
+            if self._queue.empty():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                self._batch.append(self._queue.get_nowait())
+
+    async def _send_with_retry(self, batch: List[dict]) -> bool:
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            batch = await self._send(batch)
+            if not batch:
+                return True
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+        return False
+
+    async def _send(self, batch: List[dict]) -> List[dict]:
+        """Send a batch and return the events that were not accepted"""
+        try:
+            response = await self._client.post(f"{self.url}/api/events/batch", json=batch)
+        except httpx.HTTPError:
+            return batch
+        if response.status_code == 422:
+            # Some event in the batch is invalid; send them one by one so
+            # only the bad ones are lost
+            return await self._send_each(batch)
+        if response.status_code >= 500 or response.status_code == 429:
+            return batch
+        if response.status_code >= 400:
+            events_dropped.inc("rejected", amount=len(batch))
+        else:
+            events_published.inc(amount=len(batch))
+        return []
+
+    async def _send_each(self, batch: List[dict]) -> List[dict]:
+        responses = await asyncio.gather(
+            *(self._client.post(f"{self.url}/api/events", json=event) for event in batch),
+            return_exceptions=True
+        )
+        failed = [
+            event for event, response in zip(batch, responses)
+            if isinstance(response, Exception) or response.status_code >= 500 or response.status_code == 429
+        ]
+        # Any other 4xx is a bad event that retrying cannot fix
+        rejected = sum(
+            1 for response in responses
+            if not isinstance(response, Exception) and 400 <= response.status_code < 500
+            and response.status_code != 429
+        )
+        if rejected:
+            events_dropped.inc("rejected", amount=rejected)
+        events_published.inc(amount=len(batch) - len(failed) - rejected)
+        return failed
+
+    async def _replay_spilled(self):
+        if not self.spill_path:
+            return
+        # Move the spill file aside so new overflow starts a fresh one. A
+        # replay file left by an interrupted replay is finished first.
+        replay_path = self.spill_path.with_suffix(".replay")
+        if not await asyncio.to_thread(self._take_spill, replay_path):
+            return
+
+        f = await asyncio.to_thread(open, replay_path)
+        try:
+            while True:
+                lines = await asyncio.to_thread(_read_lines, f, self.batch_size)
+                if not lines:
+                    break
+                events = [json.loads(line) for line in lines if line.strip()]
+                if not await self._send_with_retry(events):
+                    # Keep this batch and the rest of the file for later
+                    self._retry_at = asyncio.get_running_loop().time() + self.max_backoff
+                    try:
+                        await asyncio.to_thread(self._append_spill, events, f)
+                    except OSError:
+                        events_dropped.inc("spill_failed", amount=len(events))
+                    break
+        finally:
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(replay_path.unlink)
+
+    def _take_spill(self, replay_path: Path) -> bool:
+        if replay_path.exists():
+            return True
+        if not self.spill_path.exists():
+            return False
+        os.replace(self.spill_path, replay_path)
+        return True
+
+    async def close(self, timeout: float = 5.0):
+        """Send what is still queued, within `timeout`, then stop"""
+        if self._task:
+            try:
+                await asyncio.wait_for(self._drain(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # Whatever could not be sent is kept for the next start, if possible
+        remaining, self._batch = self._batch, []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        await self._overflow(remaining, "shutdown")
+        if self._client:
+            await self._client.aclose()
+
+    async def _drain(self):
+        while self._batch or not self._queue.empty():
+            await asyncio.sleep(self.flush_interval)
@@ -0,0 +1,76 @@
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+from collections import OrderedDict
+import asyncio
+import time
+from src.monitoring.metrics import idempotent_replays
+
+T = TypeVar("T")
+
+
+class IdempotencyKeyReusedError(ValueError):
+    """Raised when an idempotency key is sent again with a different request"""
+
+
+class IdempotencyCache(Generic[T]):
+    """
+    Remembers the result of recent operations by client-supplied key.
+
+    The first request with a key runs the operation. Later requests with the
+    same key get the stored result without running it again, and requests
+    that arrive while it is still running wait for that one execution. Each
+    key also records a fingerprint of its request, so a key cannot be reused
+    for a different request. At most `max_entries` results are kept, the
+    least recently used are evicted first, and results expire after `ttl` seconds.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 86_400.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires at, fingerprint, result), least recently used first
+        self._results: "OrderedDict[str, Tuple[float, Hashable, T]]" = OrderedDict()
+        self._in_flight: Dict[str, Tuple[Hashable, "asyncio.Task[T]"]] = {}
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    async def run(self, key: str, fingerprint: Hashable, operation: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run `operation` once per key; returns the result and whether it was replayed"""
+        entry = self._results.get(key)
+        if entry:
+            expires_at, stored_fingerprint, result = entry
+            if expires_at > time.monotonic():
+                self._check(fingerprint, stored_fingerprint)
+                self._results.move_to_end(key)
+                idempotent_replays.inc("cached")
+                return result, True
+            del self._results[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight:
+            self._check(fingerprint, in_flight[0])
+            idempotent_replays.inc("in_flight")
+            return await asyncio.shield(in_flight[1]), True
+
+        # The operation runs in its own task, so a client that disconnects
+        # does not abandon it half-way; its result is still stored for the retry
+        task = asyncio.ensure_future(self._execute(key, fingerprint, operation))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._in_flight[key] = (fingerprint, task)
+        return await asyncio.shield(task), False
+
+    async def _execute(self, key: str, fingerprint: Hashable, operation: Callable[[], Awaitable[T]]) -> T:
+        try:
+            # Failures are not remembered, so the client can retry with the same key
+            result = await operation()
+        finally:
+            del self._in_flight[key]
+
+        self._results[key] = (time.monotonic() + self.ttl, fingerprint, result)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _check(fingerprint: Hashable, stored_fingerprint: Hashable):
+        if fingerprint != stored_fingerprint:
+            raise IdempotencyKeyReusedError("Idempotency-Key was already used for a different request")
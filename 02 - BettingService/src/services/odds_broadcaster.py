@@ -0,0 +1,115 @@
+from typing import Dict, Optional, Sequence, Set, Tuple
+import asyncio
+import json
+from src.models.betting import BettingOdds, BetType
+from src.storage.base import BettingStorage
+
+# Sent to a subscriber whose queue overflowed; it must re-send a full snapshot
+RESYNC = b""
+HEARTBEAT = b": keep-alive\n\n"
+
+
+def sse_event(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class Subscription:
+    """A single client's feed for one match"""
+
+    __slots__ = ("match_id", "queue")
+
+    def __init__(self, match_id: str, max_queued: int):
+        self.match_id = match_id
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=max_queued)
+
+
+class OddsBroadcaster:
+    """
+    Fans out coalesced odds changes to streaming subscribers.
+
+    Storage reports every odds or status change through `mark_changed`, which
+    only records the latest state per option. A single background task
+    flushes the pending changes every `window` seconds. It encodes one delta
+    message per changed match and puts the same bytes on each subscriber's
+    queue, so a burst of changes becomes one message and the cost per update
+    does not include a task per subscriber.
+    """
+
+    def __init__(self, storage: BettingStorage, window: float = 0.25,
+                 heartbeat_interval: float = 15.0, max_queued: int = 64):
+        self.storage = storage
+        self.window = window
+        self.heartbeat_interval = heartbeat_interval
+        self.max_queued = max_queued
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        # match_id -> (bet_type, option) -> latest odds, for matches with subscribers
+        self._pending: Dict[str, Dict[Tuple[BetType, str], BettingOdds]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, match_id: str) -> Subscription:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        subscription = Subscription(match_id, self.max_queued)
+        self._subscribers.setdefault(match_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.match_id)
+        if subscribers:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.match_id]
+                self._pending.pop(subscription.match_id, None)
+
+    def mark_changed(self, match_id: str, changed_odds: Sequence[BettingOdds]):
+        if match_id not in self._subscribers:
+            return
+        pending = self._pending.setdefault(match_id, {})
+        for odds in changed_odds:
+            pending[(odds.bet_type, odds.option)] = odds
+
+    async def _run(self):
+        since_heartbeat = 0.0
+        while True:
+            await asyncio.sleep(self.window)
+            self._flush()
+            since_heartbeat += self.window
+            if since_heartbeat >= self.heartbeat_interval:
+                since_heartbeat = 0.0
+                self._broadcast_all(HEARTBEAT)
+
+    def _flush(self):
+        pending, self._pending = self._pending, {}
+        for match_id, changed in pending.items():
+            match = self.storage.get_match(match_id)
+            if not match:
+                continue
+            data = json.dumps({
+                "match_id": match_id,
+                "version": self.storage.get_match_version(match_id),
+                "status": match.status,
+                "odds": [odds.model_dump(mode="json") for odds in changed.values()],
+            }, separators=(",", ":")).encode()
+            self._broadcast(match_id, sse_event("delta", data))
+
+    def _broadcast_all(self, message: bytes):
+        for match_id in list(self._subscribers):
+            self._broadcast(match_id, message)
+
+    def _broadcast(self, match_id: str, message: bytes):
+        for subscription in self._subscribers.get(match_id, ()):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A slow client: drop what it has not read and make it resync
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(RESYNC)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,100 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.models.betting import Bet, BetType
+from src.storage.base import BettingStorage
+
+
+class _Market:
+    """Pricing state for one (match, bet_type) market"""
+
+    __slots__ = ("options", "index", "base", "overround", "total_stake", "liabilities", "prices")
+
+    def __init__(self, options: List[str], odds: List[float]):
+        implied = [1 / o for o in odds]
+        self.options = options
+        self.index = {option: i for i, option in enumerate(options)}
+        # The bookmaker margin is kept at the market's original overround, so
+        # with no money in the market the prices equal the seeded odds
+        self.overround = sum(implied)
+        self.base = [p / self.overround for p in implied]
+        self.total_stake = 0.0
+        # Amount the house pays out if each option wins
+        self.liabilities = [0.0] * len(options)
+        self.prices = list(odds)
+
+
+class OddsEngine:
+    """
+    Reprices markets from the liability taken on each option.
+
+    Each market's probabilities are a blend of the seeded (model) probabilities
+    and each option's share of the market's liability. The blend moves toward
+    the liability share as stake grows relative to `liquidity`. An option
+    that attracts money therefore gets shorter odds and the others drift. Each
+    bet costs O(number of options in its market); nothing is recomputed
+    from the stored bets.
+    """
+
+    def __init__(self, storage: BettingStorage, liquidity: float = 10_000.0, min_odds: float = 1.01):
+        self.storage = storage
+        self.liquidity = liquidity
+        self.min_odds = min_odds
+        self._markets: Dict[Tuple[str, BetType], _Market] = {}
+
+    def prepare(self, bets: Iterable[Bet]):
+        """
+        Load the markets of bets that are about to be stored. Call this before
+        storing them: a market seen for the first time takes its liability
+        from the stored bets, which must not include the ones being placed.
+        """
+        for bet in bets:
+            self._market(bet.match_id, bet.bet_type)
+
+    def record_bet(self, bet: Bet):
+        """Add a placed bet's liability to its market and publish any price changes"""
+        market = self._market(bet.match_id, bet.bet_type)
+        if not market:
+            return
+        i = market.index.get(bet.option)
+        if i is None:
+            return
+
+        market.total_stake += bet.stake
+        market.liabilities[i] += bet.potential_win
+        self._reprice(bet.match_id, bet.bet_type, market)
+
+    def _market(self, match_id: str, bet_type: BetType) -> Optional[_Market]:
+        market = self._markets.get((match_id, bet_type))
+        if market:
+            return market
+
+        odds = self.storage.get_odds_by_type(match_id, bet_type)
+        if not odds:
+            return None
+        market = _Market([o.option for o in odds], [o.odds for o in odds])
+
+        # Pick up liability from bets that were stored before this market was
+        # first priced, e.g. bets recovered from the bet log on startup
+        for totals in self.storage.get_bet_summary(match_id).options:
+            i = market.index.get(totals.option)
+            if totals.bet_type == bet_type and i is not None:
+                market.total_stake += totals.total_stake
+                market.liabilities[i] += totals.total_potential_win
+
+        self._markets[(match_id, bet_type)] = market
+        return market
+
+    def _reprice(self, match_id: str, bet_type: BetType, market: _Market):
+        total_liability = sum(market.liabilities)
+        if not total_liability:
+            return
+        weight = market.total_stake / (market.total_stake + self.liquidity)
+
+        for i, option in enumerate(market.options):
+            share = market.liabilities[i] / total_liability
+            probability = (1 - weight) * market.base[i] + weight * share
+            price = self.min_odds if probability <= 0 else max(
+                self.min_odds, round(1 / (probability * market.overround), 2)
+            )
+            if price != market.prices[i]:
+                market.prices[i] = price
+                self.storage.update_odds(match_id, bet_type, option, price)
@@ -0,0 +1,150 @@
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Sequence, Tuple, Iterator
+from datetime import datetime
+from src.models.betting import (
+    Match, BettingOdds, Bet, BetType, MatchBetSummary, SettlementTotals, OddsHistorySeries
+)
+
+# Bets are listed in (placed_at, id) order; this key is also what pagination cursors encode
+BetKey = Tuple[datetime, str]
+
+# Called with a match id and the odds that changed; an empty sequence means
+# only the match itself (e.g. its status) changed
+OddsListener = Callable[[str, Sequence[BettingOdds]], None]
+
+
+class MatchSettledError(Exception):
+    """Raised when bets are placed on, or a settlement repeats, a match already settled"""
+
+    def __init__(self, match_ids: Sequence[str]):
+        super().__init__(f"Already settled: {', '.join(match_ids)}")
+        self.match_ids = set(match_ids)
+
+
+class BettingStorage(ABC):
+    """Interface implemented by every storage backend used by BettingService"""
+
+    # Identifies this storage instance in ETags, so versions from different
+    # processes/restarts never collide
+    epoch: str
+
+    # Matches and odds
+
+    @abstractmethod
+    def get_all_matches(self) -> List[Match]:
+        """Get all matches"""
+
+    @abstractmethod
+    def get_match(self, match_id: str) -> Optional[Match]:
+        """Get a match by ID"""
+
+    @abstractmethod
+    def find_matches(self, status: Optional[str] = None, team_id: Optional[str] = None,
+                     date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                     limit: Optional[int] = None, offset: int = 0) -> List[Match]:
+        """
+        Get matches ordered by (match_date, id), optionally filtered by status,
+        by a team playing home or away, and by match_date in [date_from, date_to)
+        """
+
+    @abstractmethod
+    def update_match_status(self, match_id: str, status: str) -> Optional[Match]:
+        """Change a match's status"""
+
+    @abstractmethod
+    def get_match_version(self, match_id: str) -> int:
+        """Get a counter that changes whenever the match's odds or status change"""
+
+    @abstractmethod
+    def get_odds_for_match(self, match_id: str) -> List[BettingOdds]:
+        """Get all odds for a match"""
+
+    @abstractmethod
+    def get_odds_by_type(self, match_id: str, bet_type: BetType) -> List[BettingOdds]:
+        """Get the odds for one bet type on a match"""
+
+    @abstractmethod
+    def get_specific_odds(self, match_id: str, bet_type: BetType, option: str) -> Optional[BettingOdds]:
+        """Get the odds for a single option"""
+
+    @abstractmethod
+    def add_odds_listener(self, listener: OddsListener):
+        """Register a callback invoked whenever a match's odds or status change"""
+
+    @abstractmethod
+    def set_odds_for_match(self, match_id: str, match_odds: List[BettingOdds]):
+        """Replace all odds for a match"""
+
+    @abstractmethod
+    def update_odds(self, match_id: str, bet_type: BetType, option: str, new_odds: float) -> Optional[BettingOdds]:
+        """Change the price of a single option"""
+
+    @abstractmethod
+    def get_odds_history(self, match_id: str, since: datetime, until: datetime, max_points: int,
+                         bet_type: Optional[BetType] = None, option: Optional[str] = None) -> List[OddsHistorySeries]:
+        """
+        Get each option's price history in [since, until], downsampled to at
+        most `max_points` points, optionally for one bet type or option
+        """
+
+    @abstractmethod
+    def get_odds_opened_at(self, match_id: str) -> Optional[datetime]:
+        """Get when the match's odds were set, i.e. where its price history starts"""
+
+    # Bets
+
+    @abstractmethod
+    def place_bet(self, bet: Bet) -> Bet:
+        """Store a new bet"""
+
+    @abstractmethod
+    def place_bets(self, bets: List[Bet]) -> List[Bet]:
+        """
+        Store several new bets at once.
+
+        Raises MatchSettledError, storing none of them, if a backend shared
+        between processes finds that another process has settled one of the
+        bets' matches.
+        """
+
+    @abstractmethod
+    def get_bet(self, bet_id: str) -> Optional[Bet]:
+        """Get a bet by ID"""
+
+    @abstractmethod
+    def get_all_bets(self) -> List[Bet]:
+        """Get every stored bet"""
+
+    @abstractmethod
+    def get_bets_for_match(self, match_id: str) -> List[Bet]:
+        """Get every bet placed on a match"""
+
+    @abstractmethod
+    def iter_bets(self, match_id: Optional[str] = None, after: Optional[BetKey] = None) -> Iterator[Bet]:
+        """Yield bets in (placed_at, id) order, starting after the given key"""
+
+    @abstractmethod
+    def get_bets_page(self, limit: int, match_id: Optional[str] = None,
+                      after: Optional[BetKey] = None) -> Tuple[List[Bet], Optional[BetKey]]:
+        """Return up to `limit` bets after the given key, and the key to resume from"""
+
+    @abstractmethod
+    def get_bet_summary(self, match_id: str) -> MatchBetSummary:
+        """Get running bet totals for a match, overall and per option"""
+
+    @abstractmethod
+    def settle_match(self, match_id: str, winning_options: List[Tuple[BetType, str]]) -> SettlementTotals:
+        """
+        Settle every active bet on a match and mark the match finished.
+
+        Bets on one of `winning_options` are marked won, all others lost.
+        Raises MatchSettledError if the match was already settled.
+        """
+
+    # Lifecycle
+
+    async def wait_durable(self):
+        """Wait until every bet stored so far has reached durable storage"""
+
+    def close(self):
+        """Release files, connections and background threads"""
@@ -0,0 +1,154 @@
+from typing import Dict, List, Optional, Tuple
+from array import array
+from datetime import datetime, timedelta
+import uuid
+import numpy as np
+from src.models.betting import Bet, BetType
+
+STATUSES = ("active", "won", "lost", "void")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Sort key of a row: (placed_at in microseconds, id as 16 uuid bytes)
+RowKey = Tuple[int, bytes]
+
+
+def to_micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class BetColumns:
+    """
+    Column-oriented bet store.
+
+    Each bet is a row across typed arrays: its uuid as 16 raw bytes,
+    interned match and (bet_type, option) codes, doubles for stake, odds
+    and potential win, placed_at as integer microseconds and a status byte.
+    Bet models are only built by `bet()` when a bet is returned to a caller.
+    """
+
+    def __init__(self):
+        self.ids = bytearray()
+        self.match_codes = array("I")
+        self.option_codes = array("I")
+        self.stakes = array("d")
+        self.odds = array("d")
+        self.potential_wins = array("d")
+        self.placed_at = array("q")
+        self.statuses = bytearray()
+
+        self.match_ids: List[str] = []
+        self._match_codes: Dict[str, int] = {}
+        self.options: List[Tuple[BetType, str]] = []
+        self._option_codes: Dict[Tuple[BetType, str], int] = {}
+
+    @classmethod
+    def from_arrays(cls, ids: np.ndarray, match_ids: List[str], match_codes: np.ndarray,
+                    options: List[Tuple[BetType, str]], option_codes: np.ndarray, stakes: np.ndarray,
+                    odds: np.ndarray, potential_wins: np.ndarray, placed_at: np.ndarray) -> "BetColumns":
+        """
+        Build active bets in bulk from NumPy arrays, one element per bet.
+
+        `ids` holds 16 uuid bytes per bet and the codes index into
+        `match_ids` and `options`.
+        """
+        columns = cls()
+        columns.ids = bytearray(np.ascontiguousarray(ids, dtype=np.uint8).tobytes())
+        for name, values, dtype in (("match_codes", match_codes, np.uint32),
+                                    ("option_codes", option_codes, np.uint32),
+                                    ("stakes", stakes, np.float64),
+                                    ("odds", odds, np.float64),
+                                    ("potential_wins", potential_wins, np.float64),
+                                    ("placed_at", placed_at, np.int64)):
+            getattr(columns, name).frombytes(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        columns.statuses = bytearray(len(placed_at))
+
+        columns.match_ids = list(match_ids)
+        columns._match_codes = {match_id: code for code, match_id in enumerate(match_ids)}
+        columns.options = list(options)
+        columns._option_codes = {option: code for code, option in enumerate(options)}
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.statuses)
+
+    def append(self, bet: Bet) -> int:
+        """Add a bet and return its row number"""
+        match_code = self._match_codes.get(bet.match_id)
+        if match_code is None:
+            match_code = self._match_codes[bet.match_id] = len(self.match_ids)
+            self.match_ids.append(bet.match_id)
+
+        option_key = (bet.bet_type, bet.option)
+        option_code = self._option_codes.get(option_key)
+        if option_code is None:
+            option_code = self._option_codes[option_key] = len(self.options)
+            self.options.append(option_key)
+
+        self.ids += uuid.UUID(bet.id).bytes
+        self.match_codes.append(match_code)
+        self.option_codes.append(option_code)
+        self.stakes.append(bet.stake)
+        self.odds.append(bet.odds)
+        self.potential_wins.append(bet.potential_win)
+        self.placed_at.append(to_micros(bet.placed_at))
+        self.statuses.append(STATUS_CODES[bet.status])
+        return len(self.statuses) - 1
+
+    def option_code(self, bet_type: BetType, option: str) -> Optional[int]:
+        return self._option_codes.get((bet_type, option))
+
+    def id_bytes(self, row: int) -> bytes:
+        return bytes(self.ids[row * 16:row * 16 + 16])
+
+    def key(self, row: int) -> RowKey:
+        return self.placed_at[row], self.id_bytes(row)
+
+    def bet(self, row: int) -> Bet:
+        """Build the Bet model for a row"""
+        bet_type, option = self.options[self.option_codes[row]]
+        # The values were validated when the bet was stored, so skip re-validation
+        return Bet.model_construct(
+            id=str(uuid.UUID(bytes=self.id_bytes(row))),
+            match_id=self.match_ids[self.match_codes[row]],
+            bet_type=bet_type,
+            option=option,
+            stake=self.stakes[row],
+            odds=self.odds[row],
+            potential_win=self.potential_wins[row],
+            placed_at=from_micros(self.placed_at[row]),
+            status=STATUSES[self.statuses[row]]
+        )
+
+    def view(self, column: str, dtype) -> np.ndarray:
+        """
+        Zero-copy NumPy view of a column.
+
+        The view pins the column's buffer, so it must be released before
+        further rows are appended.
+        """
+        return np.frombuffer(getattr(self, column), dtype=dtype)
+
+    def copy(self) -> "BetColumns":
+        """Point-in-time copy, e.g. for writing a snapshot from another thread"""
+        other = BetColumns()
+        for column in ("ids", "match_codes", "option_codes", "stakes", "odds",
+                       "potential_wins", "placed_at", "statuses"):
+            setattr(other, column, getattr(self, column)[:])
+        other.match_ids = list(self.match_ids)
+        other.options = list(self.options)
+        return other
+
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers"""
+        return len(self.ids) + len(self.statuses) + sum(
+            column.itemsize * len(column)
+            for column in (self.match_codes, self.option_codes, self.stakes,
+                           self.odds, self.potential_wins, self.placed_at)
+        )
@@ -0,0 +1,217 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import threading
+import time
+from src.models.betting import Bet, BetType
+
+SEGMENT_PATTERN = "bets-*.log"
+SNAPSHOT_PATTERN = "snapshot-*.jsonl"
+
+
+def encode_bet(bet: Bet) -> list:
+    """Compact positional form of a bet used by both log records and snapshots"""
+    return [
+        bet.id, bet.match_id, bet.bet_type.value, bet.option, bet.stake,
+        bet.odds, bet.potential_win, bet.placed_at.isoformat(), bet.status
+    ]
+
+
+def bet_record(bet: Bet) -> list:
+    """Log record for a newly placed bet"""
+    return ["bet", *encode_bet(bet)]
+
+
+def settle_record(match_id: str, winning_options: List[Tuple[BetType, str]]) -> list:
+    """Log record for a match settlement"""
+    return ["settle", match_id, [[bet_type.value, option] for bet_type, option in winning_options]]
+
+
+def decode_bet(values: list) -> Bet:
+    return Bet(
+        id=values[0],
+        match_id=values[1],
+        bet_type=BetType(values[2]),
+        option=values[3],
+        stake=values[4],
+        odds=values[5],
+        potential_win=values[6],
+        placed_at=datetime.fromisoformat(values[7]),
+        status=values[8]
+    )
+
+
+def _line(record: list) -> bytes:
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+def _number(path: Path) -> int:
+    return int(path.stem.split("-", 1)[1])
+
+
+class BetLog:
+    """
+    Append-only, group-committed log of placed bets with periodic snapshots.
+
+    Records are buffered by `append` and written by a single background
+    thread, which issues one fsync for everything buffered since the last
+    flush (group commit). Callers that need durability wait on the Future
+    returned by `append`, which resolves once its batch has been fsynced.
+
+    The log is split into numbered segments. A snapshot numbered N holds
+    every bet recorded in segments <= N, so recovery loads the latest
+    snapshot and replays only the newer segments. Replay is idempotent by
+    bet id, so a record that ends up both in a snapshot and in a later
+    segment is applied once.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 0.002, snapshot_every: int = 100_000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+
+        self._cond = threading.Condition()
+        self._buffer: List[bytes] = []
+        self._batch_future: Future = Future()
+        self._inflight_future: Optional[Future] = None
+        self._since_snapshot = 0
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Never append to a segment that existed before this process started,
+        # since its last record may have been torn by a crash
+        numbers = [_number(p) for p in self.directory.glob(SEGMENT_PATTERN)]
+        numbers += [_number(p) for p in self.directory.glob(SNAPSHOT_PATTERN)]
+        self._segment = max(numbers, default=0) + 1
+
+        self._writer = threading.Thread(target=self._run, name="bet-log-writer", daemon=True)
+        self._writer.start()
+
+    def recover(self) -> Iterator[list]:
+        """Yield the records of the latest snapshot followed by the newer log segments"""
+        snapshots = sorted(self.directory.glob(SNAPSHOT_PATTERN), key=_number)
+        snapshot_number = 0
+        if snapshots:
+            snapshot_number = _number(snapshots[-1])
+            yield from self._read_records(snapshots[-1])
+
+        for segment in sorted(self.directory.glob(SEGMENT_PATTERN), key=_number):
+            if _number(segment) > snapshot_number:
+                yield from self._read_records(segment)
+
+    @staticmethod
+    def _read_records(path: Path) -> Iterator[list]:
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn final record from a crash mid-write; nothing after it was acknowledged
+                    return
+
+    def append(self, records: List[list]) -> Future:
+        """Buffer records for the writer; the returned Future resolves once they are fsynced"""
+        lines = [_line(record) for record in records]
+        with self._cond:
+            self._buffer.extend(lines)
+            self._since_snapshot += len(lines)
+            future = self._batch_future
+            self._cond.notify()
+        return future
+
+    def pending(self) -> Optional[Future]:
+        """Future for the most recent records that are not yet durable, if any"""
+        with self._cond:
+            if self._buffer:
+                return self._batch_future
+            return self._inflight_future
+
+    def snapshot_due(self) -> bool:
+        return (
+            self._since_snapshot >= self.snapshot_every
+            and (self._snapshot_thread is None or not self._snapshot_thread.is_alive())
+        )
+
+    def snapshot(self, records: Iterable[list]):
+        """
+        Write a snapshot in the background and drop the log segments it covers.
+
+        `records` must reproduce the state after every record appended so
+        far. It is consumed on the snapshot thread, so it must iterate over
+        a copy captured by the caller at the moment of this call.
+        """
+        with self._cond:
+            covered = self._segment
+            self._segment += 1
+            self._since_snapshot = 0
+
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot, args=(covered, records), name="bet-log-snapshot", daemon=True
+        )
+        self._snapshot_thread.start()
+
+    def _write_snapshot(self, covered: int, records: Iterable[list]):
+        path = self.directory / f"snapshot-{covered:08d}.jsonl"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            for record in records:
+                f.write(_line(record))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for old in self.directory.glob(SEGMENT_PATTERN):
+            if _number(old) <= covered:
+                old.unlink(missing_ok=True)
+        for old in self.directory.glob(SNAPSHOT_PATTERN):
+            if _number(old) < covered:
+                old.unlink(missing_ok=True)
+
+    def _run(self):
+        handle = None
+        handle_segment = None
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer:
+                    break
+
+            # Give concurrent writers a moment to join this batch
+            if self.flush_interval:
+                time.sleep(self.flush_interval)
+
+            with self._cond:
+                lines, self._buffer = self._buffer, []
+                future, self._batch_future = self._batch_future, Future()
+                self._inflight_future = future
+                segment = self._segment
+
+            try:
+                if segment != handle_segment:
+                    if handle:
+                        handle.close()
+                    handle = open(self.directory / f"bets-{segment:08d}.log", "ab")
+                    handle_segment = segment
+                handle.write(b"".join(lines))
+                handle.flush()
+                os.fsync(handle.fileno())
+                future.set_result(None)
+            except Exception as e:
+                future.set_exception(e)
+
+        if handle:
+            handle.close()
+
+    def close(self):
+        """Flush any buffered records and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        if self._snapshot_thread:
+            self._snapshot_thread.join()
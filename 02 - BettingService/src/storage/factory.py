@@ -0,0 +1,66 @@
+import os
+from typing import Optional
+from src.storage.base import BettingStorage
+from src.storage.seed import SeedData, generate_seed_data
+
+
+def create_seed_data() -> Optional[SeedData]:
+    """
+    Generate the dataset described by the SEED_* environment variables.
+
+    Returns None when SEED_MATCHES is unset, in which case storage starts
+    with its three built-in sample matches.
+    """
+    if not os.getenv("SEED_MATCHES"):
+        return None
+    return generate_seed_data(
+        teams=int(os.getenv("SEED_TEAMS", "20")),
+        matches=int(os.getenv("SEED_MATCHES")),
+        bets=int(os.getenv("SEED_BETS", "0")),
+        seed=int(os.getenv("SEED_RANDOM", "42"))
+    )
+
+
+def create_storage() -> BettingStorage:
+    """
+    Create the storage backend selected by the STORAGE_BACKEND environment variable.
+
+    - `memory` (default): everything is kept in process memory; set BET_LOG_DIR
+      to also record bets in a durable write-ahead log that is replayed on startup
+    - `sqlite`: bets are kept in the SQLite database at SQLITE_PATH, which is
+      safe to share between several uvicorn worker processes
+
+    Either backend starts from generated data when SEED_MATCHES is set.
+    """
+    backend = os.getenv("STORAGE_BACKEND", "memory").lower()
+
+    if backend == "memory":
+        from src.storage.memory_storage import InMemoryStorage
+        bet_log = None
+        if os.getenv("BET_LOG_DIR"):
+            from src.storage.bet_log import BetLog
+            bet_log = BetLog(
+                directory=os.getenv("BET_LOG_DIR"),
+                flush_interval=float(os.getenv("BET_LOG_FLUSH_INTERVAL_MS", "2")) / 1000,
+                snapshot_every=int(os.getenv("BET_LOG_SNAPSHOT_EVERY", "100000"))
+            )
+        return InMemoryStorage(
+            bet_log=bet_log,
+            seed_data=create_seed_data(),
+            odds_history_capacity=int(os.getenv("ODDS_HISTORY_CAPACITY", "1024"))
+        )
+
+    if backend == "sqlite":
+        from src.storage.sqlite_storage import SQLiteStorage
+        return SQLiteStorage(
+            path=os.getenv("SQLITE_PATH", "/data/betting.db"),
+            pool_size=int(os.getenv("SQLITE_POOL_SIZE", "4")),
+            seed_data=create_seed_data(),
+            odds_history_capacity=int(os.getenv("ODDS_HISTORY_CAPACITY", "1024"))
+        )
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
+# Global storage instance
+storage = create_storage()
@@ -1,15 +1,143 @@
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple, Iterator, Sequence
+from array import array
 from datetime import datetime, timedelta
-from src.models.betting import Team, Match, BettingOdds, Bet, BetType
+import asyncio
+import bisect
+import uuid
+import numpy as np
+from src.models.betting import (
+    Team, Match, BettingOdds, Bet, BetType, BetTotals, OptionBetTotals, MatchBetSummary,
+    SettlementTotals, OddsHistoryPoint, OddsHistorySeries
+)
+from src.storage.base import BettingStorage, BetKey, OddsListener
+from src.storage.bet_columns import BetColumns, RowKey, STATUS_CODES, to_micros, from_micros
+from src.storage.odds_history import OddsHistory, downsample
+from src.storage.bet_log import BetLog, bet_record, settle_record, decode_bet
+from src.storage.seed import SeedData
 
+# Matches are listed in (match_date, id) order; the match indexes hold these keys
+MatchKey = Tuple[datetime, str]
 
-class InMemoryStorage:
-    def __init__(self):
+
+class InMemoryStorage(BettingStorage):
+    def __init__(self, bet_log: Optional[BetLog] = None, seed_data: Optional[SeedData] = None,
+                 odds_history_capacity: int = 1024):
         self.teams: Dict[str, Team] = {}
         self.matches: Dict[str, Match] = {}
         self.odds: Dict[str, List[BettingOdds]] = {}  # match_id -> list of odds
-        self.bets: Dict[str, Bet] = {}
-        self._initialize_sample_data()
+        # Sorted MatchKey lists over all matches, per status and per team
+        self._matches_by_date: List[MatchKey] = []
+        self._matches_by_status: Dict[str, List[MatchKey]] = {}
+        self._matches_by_team: Dict[str, List[MatchKey]] = {}
+        # match_id -> bet_type -> list of odds, and (match_id, bet_type, option) -> odds
+        self._odds_by_type: Dict[str, Dict[BetType, List[BettingOdds]]] = {}
+        self._odds_index: Dict[Tuple[str, BetType, str], BettingOdds] = {}
+        # Bounded price history for every option whose odds have changed
+        self.odds_history = OddsHistory(odds_history_capacity)
+        # Bumped whenever a match's odds or status change
+        self.epoch = uuid.uuid4().hex[:8]
+        self._match_versions: Dict[str, int] = {}
+        self._odds_listeners: List[OddsListener] = []
+        # Bets are stored as rows in typed columns, indexed by uuid bytes.
+        # Row numbers are kept sorted by (placed_at, id) globally and per match.
+        self._bets = BetColumns()
+        self._rows_by_id: Dict[bytes, int] = {}
+        self._order = array("I")
+        self._rows_by_match: Dict[str, array] = {}
+        # Running totals per match and per (bet_type, option)
+        self._match_totals: Dict[str, BetTotals] = {}
+        self._option_totals: Dict[str, Dict[Tuple[BetType, str], OptionBetTotals]] = {}
+        # match_id -> winning options, kept so snapshots can record settlements
+        self._settlements: Dict[str, List[Tuple[BetType, str]]] = {}
+        if seed_data:
+            self.load_seed_data(seed_data)
+        else:
+            self._initialize_sample_data()
+
+        # Optional write-ahead log; bets are recovered from it before any new ones are accepted
+        self.bet_log = bet_log
+        if bet_log:
+            self._recover(bet_log)
+
+    def _recover(self, bet_log: BetLog):
+        for record in bet_log.recover():
+            if record[0] == "bet":
+                bet = decode_bet(record[1:])
+                if uuid.UUID(bet.id).bytes not in self._rows_by_id:
+                    self._store_bet(bet)
+            elif record[0] == "settle":
+                winning_options = [(BetType(bet_type), option) for bet_type, option in record[2]]
+                self._settle(record[1], winning_options)
+
+    def load_seed_data(self, seed_data: SeedData):
+        """Replace the teams, matches and odds with generated ones and bulk load any seeded bets"""
+        self.teams = {team.id: team for team in seed_data.teams}
+        self.matches = {}
+        self._matches_by_date = []
+        self._matches_by_status = {}
+        self._matches_by_team = {}
+        for match in seed_data.matches:
+            self.add_match(match)
+        self.odds = {}
+        self._odds_by_type = {}
+        self._odds_index = {}
+        for match_id, match_odds in seed_data.odds.items():
+            self.set_odds_for_match(match_id, match_odds)
+        if seed_data.bets is not None:
+            self._load_bets(seed_data.bets)
+
+    def _load_bets(self, bets: BetColumns):
+        """Adopt bulk-generated bet columns, building the indexes and totals with NumPy"""
+        if len(self._bets):
+            raise ValueError("bets can only be bulk loaded into an empty store")
+        self._bets = bets
+        count = len(bets)
+        ids = bytes(bets.ids)
+        self._rows_by_id = dict(zip([ids[i:i + 16] for i in range(0, count * 16, 16)], range(count)))
+
+        # Global (placed_at, id) order; ids compare as two big-endian words.
+        # Generated bets are usually already in placement order.
+        placed_at = bets.view("placed_at", np.int64)
+        if np.all(placed_at[1:] > placed_at[:-1]):
+            order = np.arange(count, dtype=np.uint32)
+        else:
+            words = bets.view("ids", ">u8").reshape(-1, 2)
+            order = np.lexsort((words[:, 1], words[:, 0], placed_at)).astype(np.uint32)
+        self._order = array("I", order.tobytes())
+
+        # Per-match rows: a stable sort by match keeps each match's rows in global order
+        match_codes = bets.view("match_codes", np.uint32)
+        by_match = order[np.argsort(match_codes[order], kind="stable")]
+        match_counts = np.bincount(match_codes, minlength=len(bets.match_ids))
+        for code, rows in enumerate(np.split(by_match, np.cumsum(match_counts)[:-1])):
+            if len(rows):
+                self._rows_by_match[bets.match_ids[code]] = array("I", rows.tobytes())
+
+        # Running totals per match and per (match, option), summed with bincount
+        stakes = bets.view("stakes", np.float64)
+        potential_wins = bets.view("potential_wins", np.float64)
+        option_count = len(bets.options)
+        keys = match_codes.astype(np.int64) * option_count + bets.view("option_codes", np.uint32)
+        size = len(bets.match_ids) * option_count
+        counts = np.bincount(keys, minlength=size)
+        stake_sums = np.bincount(keys, weights=stakes, minlength=size)
+        win_sums = np.bincount(keys, weights=potential_wins, minlength=size)
+        for key in np.flatnonzero(counts).tolist():
+            match_id = bets.match_ids[key // option_count]
+            bet_type, option = bets.options[key % option_count]
+            self._option_totals.setdefault(match_id, {})[(bet_type, option)] = OptionBetTotals(
+                bet_type=bet_type,
+                option=option,
+                count=int(counts[key]),
+                total_stake=float(stake_sums[key]),
+                total_potential_win=float(win_sums[key])
+            )
+        for match_id, option_totals in self._option_totals.items():
+            self._match_totals[match_id] = BetTotals(
+                count=sum(o.count for o in option_totals.values()),
+                total_stake=sum(o.total_stake for o in option_totals.values()),
+                total_potential_win=sum(o.total_potential_win for o in option_totals.values())
+            )
 
     def _initialize_sample_data(self):
         """Initialize with sample teams, matches, and odds using shared IDs"""
@@ -53,9 +181,9 @@ class InMemoryStorage:
             status="scheduled"
         )
 
-        self.matches[match1.id] = match1
-        self.matches[match2.id] = match2
-        self.matches[match3.id] = match3
+        self.add_match(match1)
+        self.add_match(match2)
+        self.add_match(match3)
 
         # Create sample odds
         self._create_odds_for_match(match1)
@@ -133,7 +261,120 @@ class InMemoryStorage:
                 )
             )
 
-        self.odds[match.id] = match_odds
+        self.set_odds_for_match(match.id, match_odds)
+
+    def set_odds_for_match(self, match_id: str, match_odds: List[BettingOdds]):
+        """Replace all odds for a match and rebuild its lookup indexes"""
+        for odds in self.odds.get(match_id, []):
+            self._odds_index.pop((match_id, odds.bet_type, odds.option), None)
+
+        by_type: Dict[BetType, List[BettingOdds]] = {}
+        for odds in match_odds:
+            by_type.setdefault(odds.bet_type, []).append(odds)
+            self._odds_index[(match_id, odds.bet_type, odds.option)] = odds
+
+        self.odds[match_id] = match_odds
+        self._odds_by_type[match_id] = by_type
+
+        # Options that already have a history continue it with their new price
+        now = to_micros(datetime.utcnow())
+        self.odds_history.open_market(match_id, now)
+        for odds in match_odds:
+            key = (match_id, odds.bet_type, odds.option)
+            if key in self.odds_history:
+                self.odds_history.record(key, now, odds.odds, odds.odds)
+        self._bump_version(match_id, match_odds)
+
+    def update_odds(self, match_id: str, bet_type: BetType, option: str, new_odds: float) -> Optional[BettingOdds]:
+        """Change the price of a single option, keeping the indexes in sync"""
+        # The per-match list, the per-type bucket and the index share the same
+        # BettingOdds instance, so updating it in place keeps them all in sync.
+        odds = self._odds_index.get((match_id, bet_type, option))
+        if not odds:
+            return None
+
+        self.odds_history.record((match_id, bet_type, option), to_micros(datetime.utcnow()), odds.odds, new_odds)
+        odds.odds = new_odds
+        self._bump_version(match_id, [odds])
+        return odds
+
+    def get_odds_history(self, match_id: str, since: datetime, until: datetime, max_points: int,
+                         bet_type: Optional[BetType] = None, option: Optional[str] = None) -> List[OddsHistorySeries]:
+        odds = self.get_odds_for_match(match_id) if bet_type is None else self.get_odds_by_type(match_id, bet_type)
+        since_us, until_us = to_micros(since), to_micros(until)
+
+        series = []
+        for current in odds:
+            if option is not None and current.option != option:
+                continue
+            points = self.odds_history.points((match_id, current.bet_type, current.option))
+            if points is None:
+                # Never repriced: the current price has applied all along
+                times, prices = [since_us], [current.odds]
+            else:
+                times, prices = downsample(*points, since_us, until_us, max_points)
+            series.append(OddsHistorySeries(
+                bet_type=current.bet_type,
+                option=current.option,
+                points=[
+                    OddsHistoryPoint(timestamp=from_micros(t), odds=p)
+                    for t, p in zip(np.asarray(times).tolist(), np.asarray(prices).tolist())
+                ]
+            ))
+        return series
+
+    def get_odds_opened_at(self, match_id: str) -> Optional[datetime]:
+        opened = self.odds_history.opened_at(match_id)
+        return from_micros(opened) if opened is not None else None
+
+    def add_match(self, match: Match):
+        """Add or replace a match, keeping the match indexes in sync"""
+        existing = self.matches.get(match.id)
+        if existing:
+            self._unindex_match(existing)
+        self.matches[match.id] = match
+        key = (match.match_date, match.id)
+        bisect.insort(self._matches_by_date, key)
+        bisect.insort(self._matches_by_status.setdefault(match.status, []), key)
+        for team_id in {match.home_team.id, match.away_team.id}:
+            bisect.insort(self._matches_by_team.setdefault(team_id, []), key)
+
+    def _unindex_match(self, match: Match):
+        key = (match.match_date, match.id)
+        self._remove_key(self._matches_by_date, key)
+        self._remove_key(self._matches_by_status.get(match.status, []), key)
+        for team_id in {match.home_team.id, match.away_team.id}:
+            self._remove_key(self._matches_by_team.get(team_id, []), key)
+
+    @staticmethod
+    def _remove_key(keys: List[MatchKey], key: MatchKey):
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    def update_match_status(self, match_id: str, status: str) -> Optional[Match]:
+        match = self.matches.get(match_id)
+        if not match:
+            return None
+
+        if match.status != status:
+            key = (match.match_date, match.id)
+            self._remove_key(self._matches_by_status.get(match.status, []), key)
+            bisect.insort(self._matches_by_status.setdefault(status, []), key)
+        match.status = status
+        self._bump_version(match_id)
+        return match
+
+    def get_match_version(self, match_id: str) -> int:
+        return self._match_versions.get(match_id, 0)
+
+    def add_odds_listener(self, listener: OddsListener):
+        self._odds_listeners.append(listener)
+
+    def _bump_version(self, match_id: str, changed_odds: Sequence[BettingOdds] = ()):
+        self._match_versions[match_id] = self._match_versions.get(match_id, 0) + 1
+        for listener in self._odds_listeners:
+            listener(match_id, changed_odds)
 
     def get_all_matches(self) -> List[Match]:
         return list(self.matches.values())
@@ -141,33 +382,190 @@ class InMemoryStorage:
     def get_match(self, match_id: str) -> Optional[Match]:
         return self.matches.get(match_id)
 
+    def find_matches(self, status: Optional[str] = None, team_id: Optional[str] = None,
+                     date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                     limit: Optional[int] = None, offset: int = 0) -> List[Match]:
+        # Scan the smallest index that satisfies a filter, bounded to the
+        # date range by bisection
+        filters = []
+        if status is not None:
+            filters.append(self._matches_by_status.get(status, []))
+        if team_id is not None:
+            filters.append(self._matches_by_team.get(team_id, []))
+        keys = min(filters, key=len) if filters else self._matches_by_date
+
+        # A 1-tuple sorts before every key with the same date
+        start = bisect.bisect_left(keys, (date_from,)) if date_from else 0
+        end = bisect.bisect_left(keys, (date_to,)) if date_to else len(keys)
+
+        if len(filters) <= 1:
+            # Every key in range matches, so the page can be sliced directly
+            stop = end if limit is None else min(end, start + offset + limit)
+            return [self.matches[match_id] for _, match_id in keys[start + offset:stop]]
+
+        matches = []
+        for i in range(start, end):
+            match = self.matches[keys[i][1]]
+            if match.status != status or team_id not in (match.home_team.id, match.away_team.id):
+                continue
+            if offset:
+                offset -= 1
+                continue
+            matches.append(match)
+            if len(matches) == limit:
+                break
+        return matches
+
     def get_odds_for_match(self, match_id: str) -> List[BettingOdds]:
         return self.odds.get(match_id, [])
 
     def get_odds_by_type(self, match_id: str, bet_type: BetType) -> List[BettingOdds]:
-        all_odds = self.get_odds_for_match(match_id)
-        return [odds for odds in all_odds if odds.bet_type == bet_type]
+        return self._odds_by_type.get(match_id, {}).get(bet_type, [])
 
     def get_specific_odds(self, match_id: str, bet_type: BetType, option: str) -> Optional[BettingOdds]:
-        odds_list = self.get_odds_by_type(match_id, bet_type)
-        for odds in odds_list:
-            if odds.option == option:
-                return odds
-        return None
+        return self._odds_index.get((match_id, bet_type, option))
 
     def place_bet(self, bet: Bet) -> Bet:
-        self.bets[bet.id] = bet
+        self.place_bets([bet])
         return bet
 
+    def place_bets(self, bets: List[Bet]) -> List[Bet]:
+        for bet in bets:
+            self._store_bet(bet)
+
+        if self.bet_log and bets:
+            self.bet_log.append([bet_record(bet) for bet in bets])
+            if self.bet_log.snapshot_due():
+                self.bet_log.snapshot(self._snapshot_records(self._bets.copy(), dict(self._settlements)))
+        return bets
+
+    @staticmethod
+    def _snapshot_records(bets: BetColumns,
+                          settlements: Dict[str, List[Tuple[BetType, str]]]) -> Iterator[list]:
+        for row in range(len(bets)):
+            yield bet_record(bets.bet(row))
+        for match_id, winning_options in settlements.items():
+            yield settle_record(match_id, winning_options)
+
+    def _store_bet(self, bet: Bet):
+        row = self._bets.append(bet)
+        self._rows_by_id[self._bets.id_bytes(row)] = row
+        self._insert_row(self._order, row)
+        rows = self._rows_by_match.get(bet.match_id)
+        if rows is None:
+            rows = self._rows_by_match[bet.match_id] = array("I")
+        self._insert_row(rows, row)
+        self._add_to_totals(bet)
+
+    def _insert_row(self, rows: array, row: int):
+        # Bets almost always arrive in placed_at order, so appending is the common case
+        key = self._bets.key(row)
+        if not rows or self._bets.key(rows[-1]) <= key:
+            rows.append(row)
+        else:
+            rows.insert(bisect.bisect_right(rows, key, key=self._bets.key), row)
+
+    def _add_to_totals(self, bet: Bet):
+        match_totals = self._match_totals.get(bet.match_id)
+        if match_totals is None:
+            match_totals = self._match_totals[bet.match_id] = BetTotals()
+
+        option_totals = self._option_totals.setdefault(bet.match_id, {})
+        key = (bet.bet_type, bet.option)
+        if key not in option_totals:
+            option_totals[key] = OptionBetTotals(bet_type=bet.bet_type, option=bet.option)
+
+        for totals in (match_totals, option_totals[key]):
+            totals.count += 1
+            totals.total_stake += bet.stake
+            totals.total_potential_win += bet.potential_win
+
     def get_bet(self, bet_id: str) -> Optional[Bet]:
-        return self.bets.get(bet_id)
+        try:
+            row = self._rows_by_id.get(uuid.UUID(bet_id).bytes)
+        except ValueError:
+            return None
+        return self._bets.bet(row) if row is not None else None
 
     def get_all_bets(self) -> List[Bet]:
-        return list(self.bets.values())
+        return [self._bets.bet(row) for row in self._order]
 
     def get_bets_for_match(self, match_id: str) -> List[Bet]:
-        return [bet for bet in self.bets.values() if bet.match_id == match_id]
+        return [self._bets.bet(row) for row in self._rows_by_match.get(match_id, [])]
+
+    def _rows(self, match_id: Optional[str]) -> array:
+        return self._order if match_id is None else self._rows_by_match.get(match_id, array("I"))
+
+    def _start(self, rows: array, after: Optional[BetKey]) -> int:
+        if not after:
+            return 0
+        after_key: RowKey = (to_micros(after[0]), uuid.UUID(after[1]).bytes)
+        return bisect.bisect_right(rows, after_key, key=self._bets.key)
+
+    def iter_bets(self, match_id: Optional[str] = None, after: Optional[BetKey] = None) -> Iterator[Bet]:
+        """Yield bets in (placed_at, id) order, starting after the given key"""
+        rows = self._rows(match_id)
+        position = self._start(rows, after)
+        while position < len(rows):
+            yield self._bets.bet(rows[position])
+            position += 1
+
+    def get_bets_page(self, limit: int, match_id: Optional[str] = None,
+                      after: Optional[BetKey] = None) -> Tuple[List[Bet], Optional[BetKey]]:
+        """Return up to `limit` bets after the given key, and the key to resume from"""
+        rows = self._rows(match_id)
+        start = self._start(rows, after)
+        bets = [self._bets.bet(row) for row in rows[start:start + limit]]
+        next_key = (bets[-1].placed_at, bets[-1].id) if start + limit < len(rows) else None
+        return bets, next_key
+
+    def get_bet_summary(self, match_id: str) -> MatchBetSummary:
+        return MatchBetSummary(
+            match_id=match_id,
+            totals=self._match_totals.get(match_id, BetTotals()).model_copy(),
+            options=[t.model_copy() for t in self._option_totals.get(match_id, {}).values()]
+        )
+
+    def settle_match(self, match_id: str, winning_options: List[Tuple[BetType, str]]) -> SettlementTotals:
+        totals = self._settle(match_id, winning_options)
+        if self.bet_log:
+            self.bet_log.append([settle_record(match_id, winning_options)])
+        return totals
+
+    def _settle(self, match_id: str, winning_options: List[Tuple[BetType, str]]) -> SettlementTotals:
+        self._settlements[match_id] = winning_options
+        self.update_match_status(match_id, "finished")
+
+        match_rows = self._rows_by_match.get(match_id)
+        if not match_rows:
+            return SettlementTotals()
+
+        # Vectorized over zero-copy views of the columns; the views are
+        # released when this method returns
+        rows = np.frombuffer(match_rows, dtype=np.uint32)
+        statuses = self._bets.view("statuses", np.uint8)
+        rows = rows[statuses[rows] == STATUS_CODES["active"]]
+
+        codes = self._bets.view("option_codes", np.uint32)[rows]
+        winning_codes = [
+            code for code in (self._bets.option_code(*o) for o in winning_options) if code is not None
+        ]
+        won = np.isin(codes, winning_codes)
+        statuses[rows] = np.where(won, STATUS_CODES["won"], STATUS_CODES["lost"])
+
+        return SettlementTotals(
+            bets_settled=len(rows),
+            bets_won=int(won.sum()),
+            total_stake=float(self._bets.view("stakes", np.float64)[rows].sum()),
+            total_payout=float(self._bets.view("potential_wins", np.float64)[rows][won].sum())
+        )
 
+    async def wait_durable(self):
+        if self.bet_log:
+            pending = self.bet_log.pending()
+            if pending:
+                await asyncio.wrap_future(pending)
 
-# Global storage instance
-storage = InMemoryStorage()
\ No newline at end of file
+    def close(self):
+        if self.bet_log:
+            self.bet_log.close()
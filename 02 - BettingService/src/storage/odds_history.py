@@ -0,0 +1,115 @@
+from typing import Dict, Optional, Tuple
+import numpy as np
+from src.models.betting import BetType
+
+# (match_id, bet_type, option)
+OptionKey = Tuple[str, BetType, str]
+
+# Points a ring has room for when it is created
+_INITIAL_POINTS = 16
+
+
+class _Ring:
+    """
+    Circular buffer of (timestamp in microseconds, odds) points. It starts
+    small and doubles as it fills, up to `capacity`; only then does it wrap.
+    """
+
+    __slots__ = ("times", "prices", "next", "size", "capacity")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = np.empty(min(capacity, _INITIAL_POINTS), dtype=np.int64)
+        self.prices = np.empty(len(self.times), dtype=np.float64)
+        self.next = 0
+        self.size = 0
+
+    def _grow(self):
+        # Not wrapped yet, so the points are in order at the front
+        length = min(self.capacity, 2 * len(self.times))
+        times = np.empty(length, dtype=np.int64)
+        prices = np.empty(length, dtype=np.float64)
+        times[:self.size] = self.times
+        prices[:self.size] = self.prices
+        self.times, self.prices = times, prices
+        self.next = self.size
+
+    def append(self, timestamp: int, price: float):
+        if self.size == len(self.times) < self.capacity:
+            self._grow()
+        self.times[self.next] = timestamp
+        self.prices[self.next] = price
+        self.next = (self.next + 1) % len(self.times)
+        self.size = min(self.size + 1, len(self.times))
+
+    def ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The points oldest first"""
+        if self.size < len(self.times):
+            return self.times[:self.size], self.prices[:self.size]
+        return (np.concatenate((self.times[self.next:], self.times[:self.next])),
+                np.concatenate((self.prices[self.next:], self.prices[:self.next])))
+
+
+class OddsHistory:
+    """
+    Price history per (match, bet_type, option) in fixed-size ring buffers.
+
+    A ring is only allocated when an option's price first changes, starting
+    with the price it had when the match's odds were set, so untouched
+    markets cost nothing. Rings grow with the history they hold and keep the
+    latest `capacity` points, which bounds memory however long a market
+    stays open.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self._rings: Dict[OptionKey, _Ring] = {}
+        # match_id -> when its odds were first set, in microseconds
+        self._opened: Dict[str, int] = {}
+
+    def __contains__(self, key: OptionKey) -> bool:
+        return key in self._rings
+
+    def open_market(self, match_id: str, timestamp: int):
+        self._opened.setdefault(match_id, timestamp)
+
+    def opened_at(self, match_id: str) -> Optional[int]:
+        return self._opened.get(match_id)
+
+    def record(self, key: OptionKey, timestamp: int, old_price: float, new_price: float):
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = _Ring(self.capacity)
+            ring.append(self._opened.get(key[0], timestamp), old_price)
+        ring.append(timestamp, new_price)
+
+    def points(self, key: OptionKey) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        ring = self._rings.get(key)
+        return ring.ordered() if ring else None
+
+    def nbytes(self) -> int:
+        return sum(ring.times.nbytes + ring.prices.nbytes for ring in self._rings.values())
+
+
+def downsample(times: np.ndarray, prices: np.ndarray, since: int, until: int,
+               max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a price series to at most `max_points` points in [since, until].
+
+    The price in effect at `since` becomes the first point. Odds are a step
+    function, so within each of `max_points` equal time buckets the last
+    change is kept.
+    """
+    start = np.searchsorted(times, since, side="right")
+    end = np.searchsorted(times, until, side="right")
+    window_times, window_prices = times[start:end], prices[start:end]
+
+    if len(window_times) > max_points - 1:
+        buckets = (window_times - since) * (max_points - 1) // (until - since + 1)
+        last = np.append(buckets[1:] != buckets[:-1], True)
+        window_times, window_prices = window_times[last], window_prices[last]
+
+    if start > 0:
+        window_times = np.concatenate(([since], window_times))
+        window_prices = np.concatenate(([prices[start - 1]], window_prices))
+    return window_times, window_prices
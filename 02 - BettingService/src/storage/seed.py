@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import numpy as np
+from src.models.betting import Team, Match, BettingOdds, BetType
+from src.storage.bet_columns import BetColumns, to_micros
+
+# (bet_type, option, description, base odds) for every market offered on a
+# match; descriptions are formatted with the home and away team names
+ODDS_TEMPLATE: List[Tuple[BetType, str, str, float]] = (
+    [
+        (BetType.MATCH_WINNER, "home_win", "{home} to win", 2.10),
+        (BetType.MATCH_WINNER, "draw", "Draw", 3.20),
+        (BetType.MATCH_WINNER, "away_win", "{away} to win", 3.50),
+        (BetType.GOALS_ABOVE_3, "yes", "More than 3 goals in match", 2.75),
+        (BetType.GOALS_ABOVE_3, "no", "3 goals or fewer in match", 1.45),
+    ]
+    + [(BetType.YELLOW_CARDS, str(i), f"Exactly {i} yellow cards", 3.0 + i * 0.5) for i in range(6)]
+    + [(BetType.RED_CARDS, str(i), f"Exactly {i} red cards", 2.0 + i * 1.5) for i in range(4)]
+)
+
+_CITIES = (
+    "Northbridge", "Eastmoor", "Westfield", "Southport", "Kingsford", "Ashby", "Redhill",
+    "Oakham", "Riverton", "Stonegate", "Fairhaven", "Millbrook", "Highcliff", "Lakeside",
+    "Brampton", "Cresthaven", "Dunmore", "Elmstead", "Glenwood", "Harrowgate",
+)
+_SUFFIXES = ("United", "City", "Rovers", "Athletic", "Town", "Wanderers", "Albion", "County")
+
+# Seeded matches are spread over this many days from startup, and seeded
+# bets over this many days before it
+MATCH_SPREAD_DAYS = 180
+BET_SPREAD_DAYS = 30
+
+
+class SeedData:
+    """Generated reference data and, optionally, pre-placed bets in column form"""
+
+    def __init__(self, teams: List[Team], matches: List[Match],
+                 odds: Dict[str, List[BettingOdds]], bets: Optional[BetColumns]):
+        self.teams = teams
+        self.matches = matches
+        self.odds = odds
+        self.bets = bets
+
+
+def _uuids(rng: np.random.Generator, count: int) -> np.ndarray:
+    """`count` random version 4 uuids as rows of 16 bytes"""
+    ids = rng.integers(0, 256, size=(count, 16), dtype=np.uint8)
+    ids[:, 6] = (ids[:, 6] & 0x0F) | 0x40
+    ids[:, 8] = (ids[:, 8] & 0x3F) | 0x80
+    return ids
+
+
+def _uuid_strings(ids: np.ndarray) -> List[str]:
+    """Format rows of 16 uuid bytes as canonical uuid strings"""
+    digits = ids.tobytes().hex()
+    return [
+        f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-{digits[i + 12:i + 16]}-{digits[i + 16:i + 20]}-{digits[i + 20:i + 32]}"
+        for i in range(0, len(digits), 32)
+    ]
+
+
+def _team_name(n: int) -> str:
+    name = f"{_CITIES[n % len(_CITIES)]} {_SUFFIXES[n // len(_CITIES) % len(_SUFFIXES)]}"
+    rounds = n // (len(_CITIES) * len(_SUFFIXES))
+    return f"{name} {rounds + 1}" if rounds else name
+
+
+def generate_seed_data(teams: int, matches: int, bets: int = 0, seed: int = 42,
+                       now: Optional[datetime] = None) -> SeedData:
+    """
+    Generate teams, matches, odds and bets in bulk from a fixed random seed.
+
+    Ids are deterministic: teams and matches are numbered (`team-1`,
+    `match-1`, ...) and odds and bet uuids come from the seeded generator,
+    so every process started with the same settings serves the same ids.
+    Dates are relative to `now`. Bets are generated as whole columns rather
+    than one model at a time, so large datasets load in seconds.
+    """
+    if teams < 2:
+        raise ValueError("at least 2 teams are needed to seed matches")
+    if bets and not matches:
+        raise ValueError("bets can only be seeded together with matches")
+    rng = np.random.default_rng(seed)
+    now = now or datetime.utcnow()
+
+    team_models = [Team(id=f"team-{n + 1}", name=_team_name(n)) for n in range(teams)]
+
+    # Pair each home team with a different away team and spread kick-offs
+    # in date order over the coming months
+    home = rng.integers(0, teams, matches)
+    away = (home + rng.integers(1, teams, matches)) % teams
+    kickoff_minutes = np.sort(rng.integers(60, MATCH_SPREAD_DAYS * 24 * 60, matches))
+    match_models = [
+        Match(
+            id=f"match-{n + 1}",
+            home_team=team_models[home[n]],
+            away_team=team_models[away[n]],
+            match_date=now + timedelta(minutes=int(kickoff_minutes[n])),
+            status="scheduled"
+        )
+        for n in range(matches)
+    ]
+
+    # Each match's prices are the template odds moved by up to 10%
+    base_odds = np.array([price for *_, price in ODDS_TEMPLATE])
+    prices = np.round(base_odds * rng.uniform(0.9, 1.1, (matches, len(ODDS_TEMPLATE))), 2)
+    odds_ids = _uuid_strings(_uuids(rng, matches * len(ODDS_TEMPLATE)))
+    odds = {}
+    for n, match in enumerate(match_models):
+        names = {"home": match.home_team.name, "away": match.away_team.name}
+        odds[match.id] = [
+            BettingOdds(
+                id=odds_ids[n * len(ODDS_TEMPLATE) + i],
+                match_id=match.id,
+                bet_type=bet_type,
+                description=description.format(**names),
+                odds=float(prices[n, i]),
+                option=option
+            )
+            for i, (bet_type, option, description, _) in enumerate(ODDS_TEMPLATE)
+        ]
+
+    bet_columns = None
+    if bets:
+        match_codes = rng.integers(0, matches, bets, dtype=np.uint32)
+        option_codes = rng.integers(0, len(ODDS_TEMPLATE), bets, dtype=np.uint32)
+        bet_odds = prices[match_codes, option_codes]
+        stakes = np.round(rng.uniform(1, 100, bets), 2)
+        # Strictly increasing placement times over the days before startup
+        mean_gap = max(2, BET_SPREAD_DAYS * 86_400_000_000 // bets)
+        placed_at = np.cumsum(rng.integers(1, 2 * mean_gap, bets, dtype=np.int64))
+        placed_at += to_micros(now) - int(placed_at[-1])
+        bet_columns = BetColumns.from_arrays(
+            ids=_uuids(rng, bets),
+            match_ids=[match.id for match in match_models],
+            match_codes=match_codes,
+            options=[(bet_type, option) for bet_type, option, *_ in ODDS_TEMPLATE],
+            option_codes=option_codes,
+            stakes=stakes,
+            odds=bet_odds,
+            potential_wins=stakes * bet_odds,
+            placed_at=placed_at
+        )
+
+    return SeedData(team_models, match_models, odds, bet_columns)
@@ -0,0 +1,307 @@
+from typing import List, Optional, Tuple, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import queue
+import sqlite3
+import uuid
+from src.models.betting import (
+    Bet, BetType, BetTotals, OptionBetTotals, MatchBetSummary, SettlementTotals
+)
+from src.storage.base import BetKey, MatchSettledError
+from src.storage.bet_columns import BetColumns, STATUSES, from_micros
+from src.storage.memory_storage import InMemoryStorage
+from src.storage.seed import SeedData
+
+# Number of rows fetched per query when streaming bets
+ITER_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bets (
+    id TEXT PRIMARY KEY,
+    match_id TEXT NOT NULL,
+    bet_type TEXT NOT NULL,
+    option TEXT NOT NULL,
+    stake REAL NOT NULL,
+    odds REAL NOT NULL,
+    potential_win REAL NOT NULL,
+    placed_at TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bets_placed_at ON bets (placed_at, id);
+CREATE INDEX IF NOT EXISTS idx_bets_match_placed_at ON bets (match_id, placed_at, id);
+CREATE TABLE IF NOT EXISTS bet_totals (
+    match_id TEXT NOT NULL,
+    bet_type TEXT NOT NULL,
+    option TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total_stake REAL NOT NULL,
+    total_potential_win REAL NOT NULL,
+    PRIMARY KEY (match_id, bet_type, option)
+);
+CREATE TABLE IF NOT EXISTS settled_matches (
+    match_id TEXT PRIMARY KEY,
+    settled_at TEXT NOT NULL
+);
+"""
+
+_BET_COLUMNS = "id, match_id, bet_type, option, stake, odds, potential_win, placed_at, status"
+
+# Statements are kept as constants so sqlite3's per-connection statement cache
+# reuses the prepared statement on every call
+_INSERT_BET = f"INSERT INTO bets ({_BET_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_UPSERT_TOTALS = """
+INSERT INTO bet_totals (match_id, bet_type, option, count, total_stake, total_potential_win)
+VALUES (?, ?, ?, 1, ?, ?)
+ON CONFLICT (match_id, bet_type, option) DO UPDATE SET
+    count = count + 1,
+    total_stake = total_stake + excluded.total_stake,
+    total_potential_win = total_potential_win + excluded.total_potential_win
+"""
+_INSERT_SEEDED_BET = f"INSERT OR IGNORE INTO bets ({_BET_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_REBUILD_TOTALS = """
+INSERT OR REPLACE INTO bet_totals (match_id, bet_type, option, count, total_stake, total_potential_win)
+SELECT match_id, bet_type, option, COUNT(*), SUM(stake), SUM(potential_win)
+FROM bets GROUP BY match_id, bet_type, option
+"""
+_SELECT_BET = f"SELECT {_BET_COLUMNS} FROM bets WHERE id = ?"
+_SELECT_ALL = f"SELECT {_BET_COLUMNS} FROM bets ORDER BY placed_at, id"
+_SELECT_MATCH = f"SELECT {_BET_COLUMNS} FROM bets WHERE match_id = ? ORDER BY placed_at, id"
+_SELECT_PAGE = f"SELECT {_BET_COLUMNS} FROM bets WHERE (placed_at, id) > (?, ?) ORDER BY placed_at, id LIMIT ?"
+_SELECT_MATCH_PAGE = (
+    f"SELECT {_BET_COLUMNS} FROM bets WHERE match_id = ? AND (placed_at, id) > (?, ?) "
+    "ORDER BY placed_at, id LIMIT ?"
+)
+_SELECT_TOTALS = (
+    "SELECT bet_type, option, count, total_stake, total_potential_win "
+    "FROM bet_totals WHERE match_id = ?"
+)
+
+_SELECT_ALL_SETTLED = "SELECT match_id FROM settled_matches"
+# {matches} is a list of placeholders for the match ids of a batch
+_SELECT_SETTLED = "SELECT match_id FROM settled_matches WHERE match_id IN ({matches})"
+_INSERT_SETTLED = "INSERT OR IGNORE INTO settled_matches (match_id, settled_at) VALUES (?, ?)"
+
+# Settlement runs as two set-based statements over the match's active bets,
+# in one write transaction; {won} is a row-value IN list of the winning
+# (bet_type, option) pairs
+_SETTLEMENT_TOTALS = """
+SELECT COUNT(*), COALESCE(SUM(stake), 0),
+       COALESCE(SUM(won), 0), COALESCE(SUM(CASE WHEN won THEN potential_win ELSE 0 END), 0)
+FROM (SELECT stake, potential_win, (bet_type, option) IN ({won}) AS won
+      FROM bets WHERE match_id = ? AND status = 'active')
+"""
+_SETTLE_BETS = """
+UPDATE bets SET status = CASE WHEN (bet_type, option) IN ({won}) THEN 'won' ELSE 'lost' END
+WHERE match_id = ? AND status = 'active'
+"""
+
+# Sorts before every stored placed_at, used when paging from the start
+_MIN_KEY = ("", "")
+
+
+def _encode_time(value: datetime) -> str:
+    # Fixed-width timestamps so text ordering matches time ordering
+    return value.isoformat(timespec="microseconds")
+
+
+def _row_to_bet(row: tuple) -> Bet:
+    return Bet(
+        id=row[0],
+        match_id=row[1],
+        bet_type=BetType(row[2]),
+        option=row[3],
+        stake=row[4],
+        odds=row[5],
+        potential_win=row[6],
+        placed_at=datetime.fromisoformat(row[7]),
+        status=row[8]
+    )
+
+
+class SQLiteStorage(InMemoryStorage):
+    """
+    Storage that keeps bets in a shared SQLite database.
+
+    Bets and their running totals live in SQLite (WAL mode), so several
+    uvicorn worker processes see one consistent bet book. Teams, matches
+    and odds are reference data and are still held in memory by each worker,
+    so odds and match status changes only apply to the worker that made them.
+    The exception is settlement: settled matches are recorded in the
+    database, and placing bets checks that table in the same write
+    transaction, so no worker can add bets to a match another one settled.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, seed_data: Optional[SeedData] = None,
+                 odds_history_capacity: int = 1024):
+        super().__init__(odds_history_capacity=odds_history_capacity)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+        if seed_data:
+            self.load_seed_data(seed_data)
+        self._mark_settled()
+
+    def _mark_settled(self, match_ids: Optional[List[str]] = None):
+        """Mark matches settled by any worker as finished in this worker's memory"""
+        if match_ids is None:
+            with self._connection() as conn:
+                match_ids = [row[0] for row in conn.execute(_SELECT_ALL_SETTLED)]
+        for match_id in match_ids:
+            match = self.get_match(match_id)
+            if match and match.status != "finished":
+                self.update_match_status(match_id, "finished")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def _load_bets(self, bets: BetColumns):
+        # Seeded bets have deterministic ids, so every worker (and every
+        # restart) can load the same seed and the database keeps one copy
+        rows = (
+            (str(uuid.UUID(bytes=bets.id_bytes(row))), bets.match_ids[bets.match_codes[row]],
+             bets.options[bets.option_codes[row]][0].value, bets.options[bets.option_codes[row]][1],
+             bets.stakes[row], bets.odds[row], bets.potential_wins[row],
+             _encode_time(from_micros(bets.placed_at[row])), STATUSES[bets.statuses[row]])
+            for row in range(len(bets))
+        )
+        with self._connection() as conn, conn:
+            conn.executemany(_INSERT_SEEDED_BET, rows)
+            conn.execute(_REBUILD_TOTALS)
+
+    def place_bet(self, bet: Bet) -> Bet:
+        self.place_bets([bet])
+        return bet
+
+    def place_bets(self, bets: List[Bet]) -> List[Bet]:
+        if not bets:
+            return bets
+
+        match_ids = list({bet.match_id for bet in bets})
+        with self._connection() as conn, conn:
+            # Take the write lock first, so a settlement cannot commit between
+            # the check and the insert
+            conn.execute("BEGIN IMMEDIATE")
+            settled = [
+                row[0] for row in
+                conn.execute(_SELECT_SETTLED.format(matches=", ".join("?" * len(match_ids))), match_ids)
+            ]
+            if settled:
+                self._mark_settled(settled)
+                raise MatchSettledError(settled)
+            conn.executemany(_INSERT_BET, [
+                (bet.id, bet.match_id, bet.bet_type.value, bet.option, bet.stake, bet.odds,
+                 bet.potential_win, _encode_time(bet.placed_at), bet.status)
+                for bet in bets
+            ])
+            conn.executemany(_UPSERT_TOTALS, [
+                (bet.match_id, bet.bet_type.value, bet.option, bet.stake, bet.potential_win)
+                for bet in bets
+            ])
+        return bets
+
+    def get_bet(self, bet_id: str) -> Optional[Bet]:
+        with self._connection() as conn:
+            row = conn.execute(_SELECT_BET, (bet_id,)).fetchone()
+        return _row_to_bet(row) if row else None
+
+    def get_all_bets(self) -> List[Bet]:
+        with self._connection() as conn:
+            rows = conn.execute(_SELECT_ALL).fetchall()
+        return [_row_to_bet(row) for row in rows]
+
+    def get_bets_for_match(self, match_id: str) -> List[Bet]:
+        with self._connection() as conn:
+            rows = conn.execute(_SELECT_MATCH, (match_id,)).fetchall()
+        return [_row_to_bet(row) for row in rows]
+
+    def _select_page(self, limit: int, match_id: Optional[str],
+                     after: Optional[Tuple[str, str]]) -> List[tuple]:
+        placed_at, bet_id = after or _MIN_KEY
+        with self._connection() as conn:
+            if match_id is None:
+                return conn.execute(_SELECT_PAGE, (placed_at, bet_id, limit)).fetchall()
+            return conn.execute(_SELECT_MATCH_PAGE, (match_id, placed_at, bet_id, limit)).fetchall()
+
+    def iter_bets(self, match_id: Optional[str] = None, after: Optional[BetKey] = None) -> Iterator[Bet]:
+        # Fetch in keyset-paginated batches so a connection is never held
+        # for the lifetime of a slow streaming client
+        position = (_encode_time(after[0]), after[1]) if after else None
+        while True:
+            rows = self._select_page(ITER_BATCH_SIZE, match_id, position)
+            for row in rows:
+                yield _row_to_bet(row)
+            if len(rows) < ITER_BATCH_SIZE:
+                return
+            position = (rows[-1][7], rows[-1][0])
+
+    def get_bets_page(self, limit: int, match_id: Optional[str] = None,
+                      after: Optional[BetKey] = None) -> Tuple[List[Bet], Optional[BetKey]]:
+        position = (_encode_time(after[0]), after[1]) if after else None
+        # Fetch one extra row to learn whether another page exists
+        rows = self._select_page(limit + 1, match_id, position)
+        bets = [_row_to_bet(row) for row in rows[:limit]]
+        next_key = (bets[-1].placed_at, bets[-1].id) if len(rows) > limit else None
+        return bets, next_key
+
+    def get_bet_summary(self, match_id: str) -> MatchBetSummary:
+        with self._connection() as conn:
+            rows = conn.execute(_SELECT_TOTALS, (match_id,)).fetchall()
+
+        options = [
+            OptionBetTotals(
+                bet_type=BetType(bet_type),
+                option=option,
+                count=count,
+                total_stake=total_stake,
+                total_potential_win=total_potential_win
+            )
+            for bet_type, option, count, total_stake, total_potential_win in rows
+        ]
+        totals = BetTotals(
+            count=sum(o.count for o in options),
+            total_stake=sum(o.total_stake for o in options),
+            total_potential_win=sum(o.total_potential_win for o in options)
+        )
+        return MatchBetSummary(match_id=match_id, totals=totals, options=options)
+
+    def settle_match(self, match_id: str, winning_options: List[Tuple[BetType, str]]) -> SettlementTotals:
+        won = ", ".join(["VALUES (?, ?)"] + ["(?, ?)"] * (len(winning_options) - 1))
+        won_params = [value for bet_type, option in winning_options for value in (bet_type.value, option)]
+        try:
+            with self._connection() as conn, conn:
+                # sqlite3 would run the totals query outside any transaction;
+                # holding the write lock keeps new bets out until the update
+                conn.execute("BEGIN IMMEDIATE")
+                if not conn.execute(_INSERT_SETTLED, (match_id, _encode_time(datetime.utcnow()))).rowcount:
+                    raise MatchSettledError([match_id])
+                count, total_stake, bets_won, total_payout = conn.execute(
+                    _SETTLEMENT_TOTALS.format(won=won), (*won_params, match_id)
+                ).fetchone()
+                conn.execute(_SETTLE_BETS.format(won=won), (*won_params, match_id))
+        finally:
+            self._mark_settled([match_id])
+
+        return SettlementTotals(
+            bets_settled=count,
+            bets_won=bets_won,
+            total_stake=total_stake,
+            total_payout=total_payout
+        )
@@ -0,0 +1,56 @@
+from src.models.betting import BetType, PlaceBetRequest
+from src.services.betting_service import BettingService
+from src.storage.memory_storage import InMemoryStorage
+
+
+def make_service():
+    service = BettingService(InMemoryStorage())
+    match_id = service.get_all_matches()[0].id
+    return service, match_id
+
+
+def market(service, match_id):
+    return service.odds_engine._markets[(match_id, BetType.MATCH_WINNER)]
+
+
+def test_first_bet_liability_equals_potential_win():
+    service, match_id = make_service()
+    response = service.place_bet(PlaceBetRequest(
+        match_id=match_id, bet_type=BetType.MATCH_WINNER, option="home_win", stake=100
+    ))
+
+    assert response.success
+    book = market(service, match_id)
+    assert book.total_stake == 100
+    assert book.liabilities[book.index["home_win"]] == response.bet.potential_win
+    assert sum(book.liabilities) == response.bet.potential_win
+
+
+def test_batch_on_new_market_counts_each_bet_once():
+    service, match_id = make_service()
+    responses = service.place_bets([
+        PlaceBetRequest(match_id=match_id, bet_type=BetType.MATCH_WINNER, option=option, stake=50)
+        for option in ("home_win", "draw", "home_win")
+    ])
+
+    assert all(r.success for r in responses)
+    book = market(service, match_id)
+    summary = service.storage.get_bet_summary(match_id)
+    assert book.total_stake == sum(o.total_stake for o in summary.options) == 150
+    assert sum(book.liabilities) == sum(r.bet.potential_win for r in responses)
+
+
+def test_market_first_seen_after_startup_picks_up_stored_bets():
+    service, match_id = make_service()
+    service.odds_engine = None
+    stored = service.place_bet(PlaceBetRequest(
+        match_id=match_id, bet_type=BetType.MATCH_WINNER, option="draw", stake=20
+    )).bet
+
+    engine_service = BettingService(service.storage)
+    engine_service.place_bet(PlaceBetRequest(
+        match_id=match_id, bet_type=BetType.MATCH_WINNER, option="home_win", stake=10
+    ))
+    book = market(engine_service, match_id)
+    assert book.total_stake == 30
+    assert book.liabilities[book.index["draw"]] == stored.potential_win
@@ -0,0 +1,31 @@
+from src.models.betting import BetType
+from src.storage.odds_history import OddsHistory
+
+KEY = ("match-1", BetType.MATCH_WINNER, "home_win")
+
+
+def record(history, count):
+    history.open_market("match-1", 0)
+    for t in range(1, count + 1):
+        history.record(KEY, t, 2.0 + t - 1, 2.0 + t)
+
+
+def test_memory_grows_with_the_recorded_history():
+    few, many = OddsHistory(capacity=1024), OddsHistory(capacity=1024)
+    record(few, 3)
+    record(many, 200)
+
+    # 16 bytes per point: an int64 timestamp and a float64 price
+    assert few.nbytes() < many.nbytes() < 1024 * 16
+    times, prices = many.points(KEY)
+    assert list(times) == list(range(201))
+
+
+def test_keeps_the_latest_capacity_points():
+    history = OddsHistory(capacity=100)
+    record(history, 250)
+
+    times, prices = history.points(KEY)
+    assert list(times) == list(range(151, 251))
+    assert list(prices) == [2.0 + t for t in range(151, 251)]
+    assert history.nbytes() == 100 * 16
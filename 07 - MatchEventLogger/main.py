@@ -1,13 +1,35 @@
-from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import RedirectResponse, FileResponse
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from fastapi import FastAPI, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import RedirectResponse, FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from starlette.routing import Match
+import asyncio
+import itertools
+import queue
+import threading
 import uvicorn
 import json
+import logging
 import os
+import time
+import uuid
 from pathlib import Path
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_writer.start()
+    yield
+    # Write out everything that was accepted before shutting down
+    await asyncio.to_thread(log_writer.close)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Match Event Logger API",
@@ -25,11 +47,151 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    lifespan=lifespan,
 )
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 LOG_DIR = os.getenv("LOG_DIR", "/var/log/match-events")
 Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "100000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "1000"))
+LOG_FSYNC = os.getenv("LOG_FSYNC", "interval")
+LOG_FSYNC_INTERVAL_MS = int(os.getenv("LOG_FSYNC_INTERVAL_MS", "1000"))
+LOG_FSYNC_BATCH = int(os.getenv("LOG_FSYNC_BATCH", "1000"))
+LOG_FLUSH_TIMEOUT_MS = int(os.getenv("LOG_FLUSH_TIMEOUT_MS", "5000"))
+MAX_BATCH_EVENTS = int(os.getenv("MAX_BATCH_EVENTS", "10000"))
+STATS_CHECKPOINT_EVENTS = int(os.getenv("STATS_CHECKPOINT_EVENTS", "10000"))
+
+
+# Metrics
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Counter or gauge, optionally split by labels, rendered in Prometheus text format"""
+
+    def __init__(self, name: str, help: str, kind: str = "counter", labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_labels(self.label_names, k)} {v}" for k, v in self.values.items()]
+
+
+class Histogram(Metric):
+    """Fixed-bucket histogram: one count per bucket plus a sum per label combination"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, "histogram", labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                bucket = _labels(self.label_names, labels, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+http_requests = Metric("event_logger_http_requests_total", "HTTP requests handled", labels=["method", "route", "status"])
+http_in_flight = Metric(
+    "event_logger_http_requests_in_flight", "HTTP requests currently being handled", "gauge", ["method", "route"]
+)
+http_latency = Histogram("event_logger_http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"])
+events_appended = Metric("event_logger_events_appended_total", "Events appended to the log")
+bytes_written = Metric("event_logger_bytes_written_total", "Bytes appended to log files")
+lines_scanned = Metric("event_logger_log_lines_scanned_total", "Log lines read while answering queries")
+log_queue_depth = Metric("event_logger_queue_depth", "Events accepted but not yet written to the log", "gauge")
+fsyncs = Metric("event_logger_fsyncs_total", "fsync calls on log files")
+write_errors = Metric("event_logger_write_errors_total", "Failed writes to log files")
+METRICS = [
+    http_requests, http_in_flight, http_latency, events_appended, bytes_written, lines_scanned,
+    log_queue_depth, fsyncs, write_errors,
+]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Records request count, in-flight requests and latency per route template and status"""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[Tuple[str, str], str] = {}
+
+    def _route(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        route = self._routes.get(key)
+        if route is None:
+            route = "unmatched"
+            for candidate in scope["app"].router.routes:
+                if candidate.matches(scope)[0] == Match.FULL:
+                    route = candidate.path
+                    break
+            if len(self._routes) >= 10_000:
+                self._routes.clear()
+            self._routes[key] = route
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], self._route(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_flight.inc(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_latency.observe(time.perf_counter() - start, method, route, str(status_code))
+            http_requests.inc(method, route, str(status_code))
+            http_in_flight.inc(method, route, amount=-1)
+
+
+app.add_middleware(MetricsMiddleware)
 
 
 # Models
@@ -50,6 +212,11 @@ class LogEntry(BaseModel):
     details: dict
 
 
+class EventPage(BaseModel):
+    events: List[LogEntry]
+    next_cursor: Optional[str] = None
+
+
 # Helper functions
 def get_log_file_path(date: str = None) -> Path:
     """Get log file path for a given date (YYYY-MM-DD)"""
@@ -58,12 +225,35 @@ def get_log_file_path(date: str = None) -> Path:
     return Path(LOG_DIR) / f"events-{date}.jsonl"
 
 
-def append_event_to_log(event: MatchEvent) -> str:
-    """Append event to daily log file and return event ID"""
+def get_index_file_path(date: str) -> Path:
+    """Sidecar offset index of the log file for a date"""
+    return Path(LOG_DIR) / f"events-{date}.idx"
+
+
+def get_stats_file_path(date: str) -> Path:
+    """Checkpointed event counts of the log file for a date"""
+    return Path(LOG_DIR) / f"events-{date}.stats.json"
+
+
+_ID_TAG = uuid.uuid4().hex[:8]
+_id_sequence = itertools.count(1)
+
+
+class LogLine(NamedTuple):
+    text: str
+    event_type: str
+    match_id: Optional[str]
+    # Event timestamp truncated to the minute (YYYY-MM-DDTHH:MM)
+    minute: str
+
+
+def format_event(event: MatchEvent) -> Tuple[str, LogLine]:
+    """Build the log line for an event; returns the event ID and the line"""
     if event.timestamp is None:
         event.timestamp = datetime.now()
 
-    event_id = f"{event.timestamp.strftime('%Y%m%d%H%M%S')}-{event.event_type}"
+    # The suffix makes the ID unique: a random tag per process plus a sequence number
+    event_id = f"{event.timestamp.strftime('%Y%m%d%H%M%S')}-{event.event_type}-{_ID_TAG}{next(_id_sequence):x}"
     log_entry = {
         "id": event_id,
         "event_type": event.event_type,
@@ -73,30 +263,713 @@ def append_event_to_log(event: MatchEvent) -> str:
         "timestamp": event.timestamp.isoformat(),
         "details": event.details,
     }
+    line = json.dumps(log_entry) + "\n"
+    return event_id, LogLine(line, event.event_type, event.match_id, log_entry["timestamp"][:16])
 
-    log_file = get_log_file_path()
-    with open(log_file, "a") as f:
-        f.write(json.dumps(log_entry) + "\n")
 
-    return event_id
+def parse_log_line(line: bytes, log_file: Path, offset: int) -> Optional[dict]:
+    """The entry on a log line, or None (after a warning) if the line is malformed"""
+    try:
+        entry = json.loads(line)
+        if isinstance(entry["event_type"], str) and isinstance(entry["timestamp"], str):
+            return entry
+    except (ValueError, KeyError, TypeError):
+        pass
+    logger.warning("Skipping malformed line at offset %d of %s", offset, log_file)
+    return None
 
 
-def read_logs(date: str = None, event_type: str = None) -> List[LogEntry]:
-    """Read logs from file, optionally filtered by event type"""
-    log_file = get_log_file_path(date)
+class LogIndex:
+    """
+    Byte offsets of the lines in one daily log file, by event_type and match_id.
+
+    The index is kept in memory and in a sidecar file with one
+    `[offset, event_type, match_id]` JSON array per line. The writer adds each
+    batch right after appending it to the log. `covered` is how far into the
+    log the index reaches. When the log has grown past it (e.g. the index
+    file was lost or an append was interrupted), `catch_up` indexes the rest.
+    An index that does not match its log is rebuilt from scratch.
+    """
+
+    def __init__(self, date: str):
+        self.log_path = get_log_file_path(date)
+        self.path = get_index_file_path(date)
+        self.covered = 0
+        self.by_type: Dict[str, array] = {}
+        self.by_match: Dict[str, array] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _add(self, offset: int, event_type: str, match_id: Optional[str]):
+        self.by_type.setdefault(event_type, array("q")).append(offset)
+        if match_id is not None:
+            self.by_match.setdefault(match_id, array("q")).append(offset)
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                entries = [json.loads(line) for line in f]
+            # The last entry has to point at a line of the same type in the log,
+            # or the index belongs to a different version of the file
+            if entries:
+                offset, event_type, _ = entries[-1]
+                with open(self.log_path, "rb") as log:
+                    log.seek(offset)
+                    line = log.readline()
+                if not line.endswith(b"\n") or json.loads(line)["event_type"] != event_type:
+                    raise ValueError("index does not match the log")
+                self.covered = offset + len(line)
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Rebuilding stale index %s", self.path)
+            self.path.unlink(missing_ok=True)
+            return
+        for offset, event_type, match_id in entries:
+            self._add(offset, event_type, match_id)
+
+    def catch_up(self):
+        """Index log lines appended after `covered`; rebuild if the log shrank"""
+        with self._lock:
+            try:
+                size = self.log_path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size < self.covered:
+                self.covered = 0
+                self.by_type, self.by_match = {}, {}
+                self.path.unlink(missing_ok=True)
+            if size == self.covered:
+                return
+
+            entries = []
+            offset = self.covered
+            with open(self.log_path, "rb") as log:
+                log.seek(offset)
+                for line in log:
+                    if not line.endswith(b"\n"):
+                        # Partly written line; picked up once it is complete
+                        break
+                    # Malformed lines are skipped, but still covered
+                    entry = parse_log_line(line, self.log_path, offset) if line.strip() else None
+                    if entry is not None:
+                        entries.append((offset, entry["event_type"], entry.get("match_id")))
+                    offset += len(line)
+            lines_scanned.inc(amount=len(entries))
+            self._append(entries, offset)
+
+    def append(self, offset: int, lines: Iterable[LogLine]):
+        """Index lines the writer has just appended to the log at `offset`"""
+        entries = []
+        for line in lines:
+            entries.append((offset, line.event_type, line.match_id))
+            offset += len(line.text)
+        with self._lock:
+            # Lines a concurrent catch_up already indexed are skipped
+            self._append([entry for entry in entries if entry[0] >= self.covered], offset)
+
+    def _append(self, entries: List[Tuple[int, str, Optional[str]]], covered: int):
+        for entry in entries:
+            self._add(*entry)
+        self.covered = max(self.covered, covered)
+        try:
+            with open(self.path, "a") as f:
+                f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        except OSError as e:
+            # The index file is only a cache; the next load catches up from the log
+            logger.warning("Failed to update index %s: %s", self.path, e)
+
+    def offsets(self, event_type: Optional[str], match_id: Optional[str], start: int = 0) -> Sequence[int]:
+        """Offsets from `start` on of the lines that may match, in file order"""
+        candidates = []
+        if event_type is not None:
+            candidates.append(self.by_type.get(event_type, ()))
+        if match_id is not None:
+            candidates.append(self.by_match.get(match_id, ()))
+        # The caller checks the other filter on the lines it reads
+        smallest = min(candidates, key=len)
+        return smallest[bisect_left(smallest, start):]
+
+
+class DayStats:
+    """
+    Event counts of one daily log file by event_type, match_id and minute.
+
+    The writer adds each batch right after appending it to the log, so
+    reading the counts never touches the log. They are checkpointed to a
+    small JSON file together with `covered`, the log offset they reach. On
+    load only the part of the log after the checkpoint is read again. A
+    checkpoint that does not fit its log is discarded and the counts are
+    rebuilt from the whole file.
+    """
+
+    def __init__(self, date: str):
+        self.log_path = get_log_file_path(date)
+        self.path = get_stats_file_path(date)
+        self.covered = 0
+        self.total = 0
+        self.by_type: Dict[str, int] = {}
+        self.by_match: Dict[str, int] = {}
+        self.by_minute: Dict[str, int] = {}
+        # Events counted since the last checkpoint
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                checkpoint = json.load(f)
+            covered = checkpoint["covered"]
+            if covered > self.log_path.stat().st_size:
+                raise ValueError("checkpoint is ahead of the log")
+            self.covered = covered
+            self.total = checkpoint["total"]
+            self.by_type = checkpoint["by_type"]
+            self.by_match = checkpoint["by_match"]
+            self.by_minute = checkpoint["by_minute"]
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Discarding stale stats checkpoint %s", self.path)
+            self.path.unlink(missing_ok=True)
+
+    def _add(self, event_type: str, match_id: Optional[str], minute: str):
+        self.total += 1
+        self.by_type[event_type] = self.by_type.get(event_type, 0) + 1
+        if match_id is not None:
+            self.by_match[match_id] = self.by_match.get(match_id, 0) + 1
+        self.by_minute[minute] = self.by_minute.get(minute, 0) + 1
+        self.pending += 1
+
+    def catch_up(self):
+        """Count log lines appended after `covered`; start over if the log shrank"""
+        with self._lock:
+            try:
+                size = self.log_path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size < self.covered:
+                self.covered = self.total = 0
+                self.by_type, self.by_match, self.by_minute = {}, {}, {}
+            if size == self.covered:
+                return
+
+            scanned = 0
+            with open(self.log_path, "rb") as log:
+                log.seek(self.covered)
+                for line in log:
+                    if not line.endswith(b"\n"):
+                        # Partly written line; counted once it is complete
+                        break
+                    scanned += 1
+                    # Malformed lines are skipped, but still covered
+                    entry = parse_log_line(line, self.log_path, self.covered) if line.strip() else None
+                    if entry is not None:
+                        self._add(entry["event_type"], entry.get("match_id"), entry["timestamp"][:16])
+                    self.covered += len(line)
+            lines_scanned.inc(amount=scanned)
+
+    def append(self, offset: int, lines: Iterable[LogLine]):
+        """Count lines the writer has just appended to the log at `offset`"""
+        with self._lock:
+            for line in lines:
+                # Lines a concurrent catch_up already counted are skipped
+                if offset >= self.covered:
+                    self._add(line.event_type, line.match_id, line.minute)
+                offset += len(line.text)
+            self.covered = max(self.covered, offset)
+
+    def checkpoint(self):
+        """Save the counts; written to a temporary file first so a crash never leaves half a checkpoint"""
+        with self._lock:
+            checkpoint = json.dumps({
+                "covered": self.covered,
+                "total": self.total,
+                "by_type": self.by_type,
+                "by_match": self.by_match,
+                "by_minute": self.by_minute,
+            })
+            self.pending = 0
+        temporary = self.path.with_suffix(".tmp")
+        try:
+            with open(temporary, "w") as f:
+                f.write(checkpoint)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning("Failed to checkpoint stats %s: %s", self.path, e)
+
+
+class DailyCache:
+    """
+    Per-day objects (offset indexes, stats) of the most recently used days.
+
+    Today's object is never evicted, so the writer always updates the same
+    instance that queries use.
+    """
+
+    def __init__(self, factory, size: int):
+        self.factory = factory
+        self.size = size
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, date: str):
+        with self._lock:
+            item = self._items.get(date)
+            if item is None:
+                item = self._items[date] = self.factory(date)
+            self._items.move_to_end(date)
+            today = datetime.now().strftime("%Y-%m-%d")
+            for old_date in list(self._items)[:max(0, len(self._items) - self.size)]:
+                if old_date != today:
+                    del self._items[old_date]
+        return item
+
+
+_log_indexes = DailyCache(LogIndex, size=7)
+_day_stats = DailyCache(DayStats, size=31)
+
+
+def get_log_index(date: str) -> LogIndex:
+    """The up-to-date offset index of a day's log file"""
+    index = _log_indexes.get(date)
+    index.catch_up()
+    return index
+
+
+def get_day_stats(date: str) -> DayStats:
+    """The up-to-date event counts of a day's log file"""
+    stats = _day_stats.get(date)
+    stats.catch_up()
+    # Earlier days are complete, so their counts are saved straight away;
+    # today's are checkpointed by the writer
+    if stats.pending and date != datetime.now().strftime("%Y-%m-%d"):
+        stats.checkpoint()
+    return stats
+
+
+FSYNC_MODES = ("always", "interval", "never")
+
+
+def drop_torn_line(log_file: Path):
+    """Cut off a last line left partly written by a crash, so new lines do not run into it"""
+    try:
+        with open(log_file, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # Search backwards for the end of the last complete line
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+    except FileNotFoundError:
+        return
+    logger.warning("Dropped %d bytes of a partly written line at the end of %s", size - end, log_file)
+
+
+def _resolve(future: asyncio.Future, error: Optional[Exception]):
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+class LogWriter:
+    """
+    Appends events to the daily log file from one background thread.
+
+    Requests only put their formatted lines on a queue that holds at most
+    `queue_size` events. The writer takes whatever is queued, up to about
+    `batch_size` lines, and appends it to the day's file with a single write
+    through a handle that stays open until the date changes. How often the file is fsynced depends on `fsync`:
+
+    * `always`: every batch is fsynced before its requests are answered, so
+      concurrent requests share one fsync
+    * `interval`: fsync once `fsync_batch` events or `fsync_interval` seconds
+      have built up since the last one; a crash can lose that much
+    * `never`: leave it to the operating system
+
+    Lines are numbered in the order they are submitted, so waiting for "line
+    n written" (or synced) covers everything submitted before it too.
+    `flush()` gives up after `flush_timeout` seconds.
+    """
+
+    def __init__(self, queue_size: int = 100_000, batch_size: int = 1000, fsync: str = "interval",
+                 fsync_interval: float = 1.0, fsync_batch: int = 1000, flush_timeout: float = 5.0):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_MODES)}, not {fsync!r}")
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self.flush_timeout = flush_timeout
+        # Lines appended together; None stops the writer. The size limit is
+        # checked in events, not queue entries, in submit()
+        self._queue: "queue.Queue[Optional[Sequence[LogLine]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Lines submitted, written and fsynced so far
+        self._submitted = 0
+        self._written = 0
+        self._synced = 0
+        # (line number, wait for fsync, loop, future) of requests waiting on the writer
+        self._waiters: List[Tuple[int, bool, asyncio.AbstractEventLoop, asyncio.Future]] = []
+        # Writer thread only
+        self._file = None
+        self._date: Optional[str] = None
+        self._last_sync = time.monotonic()
+
+    def depth(self) -> int:
+        """Events accepted but not yet written"""
+        return self._submitted - self._written
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def close(self):
+        """Write out everything queued, fsync and stop the writer thread"""
+        thread = self._thread
+        if thread and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+        self._thread = None
+
+    async def submit(self, *lines: LogLine):
+        """
+        Queue lines to be appended together. Returns straight away, or once
+        they are fsynced in `always` mode. Raises `queue.Full` if they do not
+        fit in the queue.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        with self._lock:
+            if self._submitted - self._written + len(lines) > self.queue_size:
+                raise queue.Full
+            self._queue.put_nowait(lines)
+            self._submitted += len(lines)
+            number = self._submitted
+        if self.fsync == "always":
+            await self._wait(number, synced=True)
+
+    async def flush(self):
+        """
+        Wait until every line submitted so far has been written to its file.
+        Raises `asyncio.TimeoutError` if that takes over `flush_timeout` seconds.
+        """
+        await self._wait(self._submitted, synced=False, timeout=self.flush_timeout)
 
+    async def _wait(self, number: int, synced: bool, timeout: Optional[float] = None):
+        with self._lock:
+            if (self._synced if synced else self._written) >= number:
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append((number, synced, future.get_loop(), future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._waiters = [waiter for waiter in self._waiters if waiter[3] is not future]
+            raise
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self._queue.get(timeout=self._until_fsync())]
+            except queue.Empty:
+                # The fsync interval passed without new lines to write
+                self._sync_safely()
+                continue
+            count = len(batch[0] or ())
+            while count < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                count += len(batch[-1] or ())
+            stopping = batch[-1] is None
+            if stopping:
+                batch.pop()
+
+            error = None
+            try:
+                if count:
+                    self._write([line for lines in batch for line in lines])
+            except Exception as e:
+                # Caught whatever it is: a dead writer would leave every flush() waiting
+                error = e
+                write_errors.inc()
+                logger.exception("Failed to write events to the log")
+            self._written += count
+            if error is None and (stopping or self._sync_due()):
+                error = self._sync_safely()
+            if error is not None:
+                # Failed lines are not retried; their requests get the error
+                self._synced = self._written
+            self._wake(error)
+
+        if self._file:
+            try:
+                self._checkpoint()
+            except Exception:
+                logger.exception("Failed to checkpoint stats")
+            self._file.close()
+            self._file = None
+            self._date = None
+
+    def _until_fsync(self) -> Optional[float]:
+        """How long the writer can wait for new lines before an fsync is due"""
+        if self.fsync != "interval" or self._synced == self._written:
+            return None
+        return max(0.0, self._last_sync + self.fsync_interval - time.monotonic())
+
+    def _sync_due(self) -> bool:
+        if self.fsync == "always":
+            return True
+        if self.fsync == "never":
+            return False
+        return (self._written - self._synced >= self.fsync_batch
+                or time.monotonic() - self._last_sync >= self.fsync_interval)
+
+    def _write(self, lines: List[LogLine]):
+        date = datetime.now().strftime("%Y-%m-%d")
+        if date != self._date:
+            if self._file:
+                # The previous day's file is complete; make it durable before moving on
+                self._checkpoint()
+                self._file.close()
+                self._file = None
+            log_file = get_log_file_path(date)
+            drop_torn_line(log_file)
+            self._file = open(log_file, "ab")
+            self._date = date
+        # Brought up to date before the write, so they do not re-read these lines
+        index = get_log_index(date)
+        stats = get_day_stats(date)
+        offset = self._file.tell()
+        # json.dumps escapes non-ASCII characters, so characters are bytes
+        data = "".join(line.text for line in lines).encode("ascii")
+        self._file.write(data)
+        # Hand the data to the OS so queries see it straight away
+        self._file.flush()
+        index.append(offset, lines)
+        stats.append(offset, lines)
+        events_appended.inc(amount=len(lines))
+        bytes_written.inc(amount=len(data))
+        if stats.pending >= STATS_CHECKPOINT_EVENTS:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """Checkpoint the stats of the open file, once the events they count are durable"""
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+            fsyncs.inc()
+        get_day_stats(self._date).checkpoint()
+
+    def _sync_safely(self) -> Optional[Exception]:
+        """fsync the open file; returns the error instead of raising it"""
+        self._last_sync = time.monotonic()
+        try:
+            if self._file and self.fsync != "never":
+                os.fsync(self._file.fileno())
+                fsyncs.inc()
+        except OSError as e:
+            write_errors.inc()
+            logger.error("Failed to fsync the log: %s", e)
+            return e
+        self._synced = self._written
+        return None
+
+    def _wake(self, error: Optional[Exception]):
+        """Answer the requests whose lines are now written (or fsynced)"""
+        with self._lock:
+            ready, waiting = [], []
+            for waiter in self._waiters:
+                number, synced = waiter[0], waiter[1]
+                done = number <= (self._synced if synced else self._written)
+                (ready if done else waiting).append(waiter)
+            self._waiters = waiting
+        for _, synced, loop, future in ready:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, error if synced else None)
+            except RuntimeError:
+                # The request's event loop has already closed
+                pass
+
+
+log_writer = LogWriter(
+    queue_size=LOG_QUEUE_SIZE,
+    batch_size=LOG_BATCH_SIZE,
+    fsync=LOG_FSYNC,
+    fsync_interval=LOG_FSYNC_INTERVAL_MS / 1000,
+    fsync_batch=LOG_FSYNC_BATCH,
+    flush_timeout=LOG_FLUSH_TIMEOUT_MS / 1000,
+)
+
+
+async def flush_log():
+    """Wait for queued events to be written before a query reads the log"""
+    try:
+        await log_writer.flush()
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Queued events are still being written, try again shortly",
+            headers={"Retry-After": "1"}
+        )
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is not the start of a line in the log"""
+
+
+def parse_cursor(log_file: Path, cursor: Optional[str]) -> int:
+    """The file offset a cursor points at"""
+    if cursor is None:
+        return 0
+    try:
+        offset = int(cursor)
+        if offset < 0 or offset > log_file.stat().st_size:
+            raise ValueError(cursor)
+        if offset:
+            with open(log_file, "rb") as f:
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    raise ValueError(cursor)
+    except (ValueError, OSError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    return offset
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Aware datetimes as naive UTC; naive ones are taken as they are"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def iter_logs(date: str = None, event_type: str = None, match_id: str = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None,
+              start: int = 0) -> Iterator[Tuple[int, dict]]:
+    """
+    Yield matching log entries from file offset `start` on, with the offset
+    just past each one (a cursor to resume after it).
+
+    Lines are read from disk one at a time, so memory use does not depend on
+    the size of the file. With an event_type or match_id filter only the
+    lines listed in the day's offset index are read. `since` (inclusive)
+    and `until` (exclusive) bound the event timestamps. Malformed lines are
+    skipped.
+    """
+    log_file = get_log_file_path(date)
     if not log_file.exists():
-        return []
+        return
+    since = _naive_utc(since) if since else None
+    until = _naive_utc(until) if until else None
+
+    def matches(entry: dict) -> bool:
+        if event_type is not None and entry["event_type"] != event_type:
+            return False
+        if match_id is not None and entry.get("match_id") != match_id:
+            return False
+        if since or until:
+            timestamp = _naive_utc(datetime.fromisoformat(entry["timestamp"]))
+            if (since and timestamp < since) or (until and timestamp >= until):
+                return False
+        return True
+
+    scanned = 0
+    try:
+        with open(log_file, "rb") as f:
+            if event_type is None and match_id is None:
+                f.seek(start)
+                offset = start
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Still being written
+                        break
+                    scanned += 1
+                    entry = parse_log_line(line, log_file, offset) if line.strip() else None
+                    offset += len(line)
+                    if entry is not None and matches(entry):
+                        yield offset, entry
+            else:
+                # Filtered queries seek straight to the candidate lines
+                index = get_log_index(date or datetime.now().strftime("%Y-%m-%d"))
+                for offset in index.offsets(event_type, match_id, start):
+                    f.seek(offset)
+                    line = f.readline()
+                    scanned += 1
+                    entry = parse_log_line(line, log_file, offset)
+                    if entry is not None and matches(entry):
+                        yield offset + len(line), entry
+    finally:
+        lines_scanned.inc(amount=scanned)
+
+
+def read_logs(date: str = None, event_type: str = None, match_id: str = None) -> List[LogEntry]:
+    """Read logs from file, optionally filtered by event type and match"""
+    return [LogEntry(**entry) for _, entry in iter_logs(date, event_type, match_id)]
+
+
+def read_page(date: Optional[str], event_type: Optional[str], match_id: Optional[str],
+              since: Optional[datetime], until: Optional[datetime], limit: int,
+              cursor: Optional[str]) -> EventPage:
+    """Read up to `limit` matching events after `cursor`"""
+    start = parse_cursor(get_log_file_path(date), cursor)
+    events = []
+    next_cursor = None
+    for offset, entry in iter_logs(date, event_type, match_id, since, until, start):
+        if len(events) == limit:
+            # Resume after the last returned event
+            next_cursor = str(last_offset)
+            break
+        events.append(LogEntry(**entry))
+        last_offset = offset
+    return EventPage(events=events, next_cursor=next_cursor)
+
 
-    logs = []
-    with open(log_file, "r") as f:
-        for line in f:
-            if line.strip():
-                entry = json.loads(line)
-                if event_type is None or entry["event_type"] == event_type:
-                    logs.append(LogEntry(**entry))
+# Entries serialized per chunk of a streamed response
+STREAM_CHUNK = 256
 
-    return logs
+
+def _stream(entries: Iterator[Tuple[int, dict]], ndjson: bool) -> Iterator[str]:
+    """Serialize entries as NDJSON or as one JSON array, a chunk at a time"""
+    chunk = []
+    first = True
+    if not ndjson:
+        yield "["
+    for _, entry in entries:
+        line = LogEntry(**entry).model_dump_json()
+        if ndjson:
+            chunk.append(line + "\n")
+        else:
+            chunk.append(line if first else "," + line)
+            first = False
+        if len(chunk) >= STREAM_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+    if not ndjson:
+        yield "]"
 
 
 # API Endpoints
@@ -118,9 +991,24 @@ async def health_check():
         "log_directory": LOG_DIR,
         "log_dir_exists": log_dir_exists,
         "log_dir_writable": log_dir_writable,
+        "fsync": log_writer.fsync,
+        "queue_depth": log_writer.depth(),
     }
 
 
+@app.get("/api/metrics", response_class=PlainTextResponse, tags=["Health Check"])
+async def get_metrics():
+    """
+    Runtime metrics in Prometheus text format.
+
+    Includes request counts, in-flight requests and latency histograms per
+    route and status code, plus events appended, bytes written, log lines
+    scanned, fsyncs and the number of events waiting for the log writer.
+    """
+    log_queue_depth.values[()] = log_writer.depth()
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/api/events", tags=["Events"], status_code=status.HTTP_201_CREATED)
 async def log_event(event: MatchEvent):
     """
@@ -128,14 +1016,25 @@ async def log_event(event: MatchEvent):
 
     Event types: match_scheduled, match_started, match_ended,
                  bet_placed, team_created, notification_sent
+
+    The event is queued for the background log writer. With `LOG_FSYNC=always`
+    the response waits until it is fsynced; otherwise it returns straight away.
+    Returns 503 when the queue is full.
     """
+    event_id, line = format_event(event)
     try:
-        event_id = append_event_to_log(event)
+        await log_writer.submit(line)
         return {
             "success": True,
             "message": "Event logged successfully",
             "event_id": event_id,
         }
+    except queue.Full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event queue is full, try again shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -143,25 +1042,146 @@ async def log_event(event: MatchEvent):
         )
 
 
+event_list = TypeAdapter(List[MatchEvent])
+
+
+def parse_event_batch(body: bytes, content_type: str) -> List[MatchEvent]:
+    """Validate a JSON array or NDJSON body of events in one pass"""
+    if "ndjson" in content_type or not body.lstrip().startswith(b"["):
+        # Join the lines into one array so they are validated together;
+        # error locations are the event's position among the non-empty lines
+        body = b"[" + b",".join(line for line in body.splitlines() if line.strip()) + b"]"
+    try:
+        return event_list.validate_json(body)
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        for error in errors:
+            error["loc"] = ("body", *error["loc"])
+            if error["type"] == "json_invalid":
+                # The input is the whole body; don't echo it back
+                error.pop("input", None)
+        raise RequestValidationError(errors)
+
+
+@app.post("/api/events/batch", tags=["Events"], status_code=status.HTTP_201_CREATED)
+async def log_events(request: Request):
+    """
+    Log many events with one request.
+
+    The body is either a JSON array of events or NDJSON (one event per line,
+    sent as `application/x-ndjson`), with up to `MAX_BATCH_EVENTS` events. All
+    events are validated before any is logged, and they are appended to the
+    log together in one write. Returns the event IDs in request order.
+    """
+    events = parse_event_batch(await request.body(), request.headers.get("content-type", ""))
+    if not events:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The batch contains no events")
+    if len(events) > MAX_BATCH_EVENTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch can contain at most {MAX_BATCH_EVENTS} events"
+        )
+
+    event_ids, lines = zip(*(format_event(event) for event in events))
+    try:
+        await log_writer.submit(*lines)
+        return {
+            "success": True,
+            "message": f"{len(event_ids)} events logged successfully",
+            "count": len(event_ids),
+            "event_ids": event_ids,
+        }
+    except queue.Full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event queue is full, try again shortly",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to log events: {str(e)}"
+        )
+
+
 @app.get("/api/events", response_model=List[LogEntry], tags=["Events"])
 async def get_events(
     date: Optional[str] = None,
-    event_type: Optional[str] = None
+    event_type: Optional[str] = None,
+    match_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
 ):
     """
     Retrieve logged events.
 
     - **date**: Filter by date (YYYY-MM-DD format). Defaults to today.
     - **event_type**: Filter by event type (optional)
+    - **match_id**: Filter by match (optional)
+    - **since**: Only events with a timestamp at or after this (optional)
+    - **until**: Only events with a timestamp before this (optional)
+
+    The response is streamed from the log file as it is read. Filtered
+    queries read only the matching lines, located through the day's offset
+    index. Use `/api/events/page` or `/api/events/stream` for large days.
     """
+    await flush_log()
+    entries = iter_logs(date, event_type, match_id, since, until)
+    return StreamingResponse(_stream(entries, ndjson=False), media_type="application/json")
+
+
+@app.get("/api/events/page", response_model=EventPage, tags=["Events"])
+async def get_events_page(
+    date: Optional[str] = None,
+    event_type: Optional[str] = None,
+    match_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    """
+    Retrieve logged events one page at a time, in the order they were logged.
+
+    Takes the same filters as `/api/events`, plus:
+
+    - **limit**: Maximum number of events to return (1-1000)
+    - **cursor**: The `next_cursor` value from the previous page
+
+    `next_cursor` is null on the last page.
+    """
+    await flush_log()
     try:
-        logs = read_logs(date=date, event_type=event_type)
-        return logs
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to read logs: {str(e)}"
-        )
+        # Reading may scan much of the file (and catch up its index), so it
+        # runs in a worker thread rather than on the event loop
+        return await asyncio.to_thread(read_page, date, event_type, match_id, since, until, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@app.get("/api/events/stream", tags=["Events"])
+async def stream_events(
+    date: Optional[str] = None,
+    event_type: Optional[str] = None,
+    match_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None
+):
+    """
+    Stream logged events as newline-delimited JSON, in the order they were logged.
+
+    Takes the same filters as `/api/events`, plus:
+
+    - **cursor**: Optional `next_cursor` value to resume after
+    """
+    await flush_log()
+    try:
+        start = parse_cursor(get_log_file_path(date), cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    entries = iter_logs(date, event_type, match_id, since, until, start)
+    return StreamingResponse(_stream(entries, ndjson=True), media_type="application/x-ndjson")
 
 
 @app.get("/api/events/dates", tags=["Events"])
@@ -182,20 +1202,67 @@ async def get_available_dates():
 
 
 @app.get("/api/events/stats", tags=["Events"])
-async def get_event_stats(date: Optional[str] = None):
-    """Get statistics about logged events"""
-    logs = read_logs(date=date)
+async def get_event_stats(
+    date: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    include_matches: bool = False,
+    include_minutes: bool = False
+):
+    """
+    Get statistics about logged events.
 
-    event_counts = {}
-    for log in logs:
-        event_counts[log.event_type] = event_counts.get(log.event_type, 0) + 1
+    - **date**: Day to report on (YYYY-MM-DD format). Defaults to today.
+    - **date_from**, **date_to**: Report on all days in this range instead (inclusive)
+    - **include_matches**: Also count events per match
+    - **include_minutes**: Also count events per minute of their timestamp
 
-    return {
-        "success": True,
-        "date": date or datetime.now().strftime("%Y-%m-%d"),
-        "total_events": len(logs),
-        "event_counts": event_counts,
-    }
+    Counts are maintained as events are logged, so this does not read the logs.
+    """
+    if date_from or date_to:
+        if date_from and date_to and date_from > date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from must not be after date_to"
+            )
+        dates = [
+            log_file.stem.replace("events-", "")
+            for log_file in sorted(Path(LOG_DIR).glob("events-*.jsonl"))
+        ]
+        dates = [d for d in dates if (not date_from or d >= date_from) and (not date_to or d <= date_to)]
+    else:
+        dates = [date or datetime.now().strftime("%Y-%m-%d")]
+
+    await flush_log()
+    total_events = 0
+    event_counts: Dict[str, int] = {}
+    match_counts: Dict[str, int] = {}
+    minute_counts: Dict[str, int] = {}
+    for day in dates:
+        if not get_log_file_path(day).exists():
+            continue
+        stats = await asyncio.to_thread(get_day_stats, day)
+        total_events += stats.total
+        for counts, day_counts, included in (
+            (event_counts, stats.by_type, True),
+            (match_counts, stats.by_match, include_matches),
+            (minute_counts, stats.by_minute, include_minutes),
+        ):
+            if included:
+                for key, count in list(day_counts.items()):
+                    counts[key] = counts.get(key, 0) + count
+
+    result = {"success": True}
+    if date_from or date_to:
+        result.update(date_from=date_from, date_to=date_to, dates=dates)
+    else:
+        result["date"] = dates[0]
+    result.update(total_events=total_events, event_counts=event_counts)
+    if include_matches:
+        result["match_counts"] = match_counts
+    if include_minutes:
+        result["minute_counts"] = dict(sorted(minute_counts.items()))
+    return result
 
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+import pytest
+
+# main creates its log directory on import
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp())
+
+import main
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "_log_indexes", main.DailyCache(main.LogIndex, size=7))
+    monkeypatch.setattr(main, "_day_stats", main.DailyCache(main.DayStats, size=31))
+    return tmp_path
+
+
+def event_line(event_type="bet_placed", match_id="match-1"):
+    return main.format_event(main.MatchEvent(event_type=event_type, match_id=match_id))[1]
+
+
+def write(*lines):
+    """Log lines through a writer of their own and wait until they are written"""
+    writer = main.LogWriter(fsync="never")
+
+    async def submit():
+        await writer.submit(*lines)
+        await writer.flush()
+
+    try:
+        asyncio.run(submit())
+    finally:
+        writer.close()
+
+
+def restart():
+    """Forget the in-memory indexes and stats, as a new process would"""
+    main._log_indexes._items.clear()
+    main._day_stats._items.clear()
+
+
+def test_acknowledged_event_is_read_back(log_dir):
+    with TestClient(main.app) as client:
+        response = client.post("/api/events", json={"event_type": "bet_placed", "match_id": "match-7"})
+        assert response.status_code == 201
+
+        events = client.get("/api/events", params={"match_id": "match-7"}).json()
+        assert [event["id"] for event in events] == [response.json()["event_id"]]
+        assert client.get("/api/events/stats").json()["event_counts"] == {"bet_placed": 1}
+
+
+def test_failed_write_does_not_stop_the_writer(log_dir, monkeypatch):
+    get_log_index = main.get_log_index
+    failures = [RuntimeError("index is broken")]
+
+    def failing_get_log_index(date):
+        if failures:
+            raise failures.pop()
+        return get_log_index(date)
+
+    monkeypatch.setattr(main, "get_log_index", failing_get_log_index)
+    writer = main.LogWriter(fsync="never")
+
+    async def submit():
+        await writer.submit(event_line(match_id="lost"))
+        await writer.flush()
+        await writer.submit(event_line(match_id="kept"))
+        await writer.flush()
+
+    try:
+        asyncio.run(submit())
+    finally:
+        writer.close()
+    assert [entry.match_id for entry in main.read_logs()] == ["kept"]
+
+
+def test_flush_gives_up_after_its_timeout(log_dir, monkeypatch):
+    release = threading.Event()
+    get_log_index = main.get_log_index
+
+    def slow_get_log_index(date):
+        release.wait()
+        return get_log_index(date)
+
+    monkeypatch.setattr(main, "get_log_index", slow_get_log_index)
+    writer = main.LogWriter(fsync="never", flush_timeout=0.05)
+
+    async def submit():
+        await writer.submit(event_line())
+        with pytest.raises(asyncio.TimeoutError):
+            await writer.flush()
+
+    try:
+        asyncio.run(submit())
+    finally:
+        release.set()
+        writer.close()
+    assert len(main.read_logs()) == 1
+
+
+def test_write_after_torn_line_starts_on_a_new_line(log_dir):
+    before, after = event_line(match_id="match-1"), event_line(match_id="match-2")
+    log_file = main.get_log_file_path()
+    # A crash in the middle of appending the second line
+    log_file.write_text(before.text + after.text[:20])
+
+    write(after)
+
+    assert log_file.read_text() == before.text + after.text
+    assert [entry.match_id for entry in main.read_logs()] == ["match-1", "match-2"]
+
+
+def test_reads_skip_malformed_lines(log_dir):
+    first, second = event_line(event_type="match_started"), event_line(event_type="match_ended")
+    main.get_log_file_path().write_text(first.text + '{"event_type": \n' + second.text)
+
+    assert [entry.event_type for entry in main.read_logs()] == ["match_started", "match_ended"]
+    assert [entry.event_type for entry in main.read_logs(match_id="match-1")] == ["match_started", "match_ended"]
+    page = main.read_page(None, None, None, None, None, limit=1, cursor=None)
+    assert [entry.event_type for entry in page.events] == ["match_started"]
+    page = main.read_page(None, None, None, None, None, limit=1, cursor=page.next_cursor)
+    assert [entry.event_type for entry in page.events] == ["match_ended"]
+
+
+def test_stats_rebuild_skips_malformed_and_truncated_lines(log_dir):
+    first, second, third = (event_line(event_type) for event_type in ("bet_placed", "bet_placed", "match_ended"))
+    log_file = main.get_log_file_path()
+    log_file.write_text(first.text + "{not json\n" + second.text + third.text[:20])
+    today = log_file.stem.replace("events-", "")
+
+    stats = main.get_day_stats(today)
+    assert stats.total == 2
+    assert stats.by_type == {"bet_placed": 2}
+
+    write(third)
+
+    assert stats.total == 3
+    assert stats.by_type == {"bet_placed": 2, "match_ended": 1}
+
+
+def test_recovery_after_crash_with_torn_tail(log_dir):
+    write(*(event_line(match_id=f"match-{i % 2}") for i in range(4)))
+    log_file = main.get_log_file_path()
+    with open(log_file, "a") as f:
+        f.write(event_line(match_id="match-0").text[:30])
+    restart()
+
+    write(event_line(match_id="match-0"))
+
+    today = log_file.stem.replace("events-", "")
+    assert [entry.match_id for entry in main.read_logs(match_id="match-0")] == ["match-0"] * 3
+    assert main.get_day_stats(today).by_match == {"match-0": 3, "match-1": 2}
+
+
+def test_sidecars_are_rebuilt_after_deletion(log_dir):
+    write(*(event_line(event_type, f"match-{i % 3}")
+            for i, event_type in enumerate(["bet_placed"] * 5 + ["match_ended"] * 2)))
+    log_file = main.get_log_file_path()
+    today = log_file.stem.replace("events-", "")
+    index_file, stats_file = main.get_index_file_path(today), main.get_stats_file_path(today)
+    assert index_file.exists() and stats_file.exists()
+    expected = main.read_logs(event_type="bet_placed")
+
+    index_file.unlink()
+    stats_file.unlink()
+    restart()
+
+    assert main.read_logs(event_type="bet_placed") == expected
+    stats = main.get_day_stats(today)
+    assert stats.total == 7
+    assert stats.by_type == {"bet_placed": 5, "match_ended": 2}
+    assert stats.by_match == {"match-0": 3, "match-1": 2, "match-2": 2}
+    assert index_file.exists()